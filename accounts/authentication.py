@@ -0,0 +1,98 @@
+"""
+JWT autentifikatsiyasi: User SELECT'siz, token claim'laridan.
+
+Login token'iga CafeTokenObtainPairSerializer user_id, username, role, is_staff, is_superuser
+claim'larini yozadi. GET/HEAD/OPTIONS so'rovlarida (JWT_STATELESS_AUTH=True bo'lsa — barcha
+so'rovlarda) foydalanuvchi shu claim'lardan yig'iladi (User.from_db, qolgan maydonlar deferred):
+ruxsat tekshiruvi (_role) va `created_by=request.user` kabi filtr/FK'lar uchun bu yetarli.
+View claim'da yo'q maydonga murojaat qilsa, qolgan hammasi bitta so'rovda yuklanadi
+(User.refresh_from_db).
+
+is_active, role, is_staff, is_superuser jarayon ichida JWT_USER_ACTIVE_TTL soniya keshlanadi va
+claim'lar ustidan yoziladi — rol o'zgarishi token muddatini kutmay, shu TTL ichida kuchga kiradi.
+User saqlanganda shu jarayonda kesh darhol tozalanadi. Claim'dan yig'ilgan user'ni saqlab
+bo'lmaydi (User.save). Claim'lari to'liq bo'lmagan eski token'lar odatdagidek bazadan yuklanadi.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+CLAIM_FIELDS = ("username", "role", "is_staff", "is_superuser")
+STATE_FIELDS = ("is_active", "role", "is_staff", "is_superuser")
+
+_state = {}  # user_id -> ({is_active, role, is_staff, is_superuser}, muddati)
+_state_lock = threading.Lock()
+
+
+def user_state(user_id):
+    """STATE_FIELDS lug'ati; user o'chirilgan bo'lsa None. TTL ichida bazaga murojaat yo'q."""
+    now = time.monotonic()
+    cached = _state.get(user_id)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+    row = get_user_model().objects.filter(pk=user_id).values(*STATE_FIELDS).first()
+    with _state_lock:
+        _state[user_id] = (row, now + settings.JWT_USER_ACTIVE_TTL)
+    return row
+
+
+def forget_user(user_id=None):
+    """user_state keshini tozalaydi (user_id=None — hammasini)."""
+    with _state_lock:
+        if user_id is None:
+            _state.clear()
+        else:
+            _state.pop(user_id, None)
+
+
+def user_from_claims(token):
+    """Token claim'laridan User; claim yetishmasa None."""
+    claims = {name: token.get(name) for name in CLAIM_FIELDS}
+    claims["id"] = token.get(api_settings.USER_ID_CLAIM)
+    if any(value is None for value in claims.values()):
+        return None
+    User = get_user_model()
+    names = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+    user = User.from_db(DEFAULT_DB_ALIAS, names, [claims[name] for name in names])
+    user._from_claims = user._claims_user = True
+    return user
+
+
+class CafeJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        if request.method in SAFE_METHODS or settings.JWT_STATELESS_AUTH:
+            user = user_from_claims(validated_token)
+            if user is not None:
+                return self._apply_state(user), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def _apply_state(self, user):
+        state = user_state(user.pk)
+        if state is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if not state["is_active"] and api_settings.CHECK_USER_IS_ACTIVE:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        for name, value in state.items():
+            setattr(user, name, value)
+        return user
+
+
+class CafeJWTScheme(SimpleJWTScheme):
+    """OpenAPI: jwtAuth sxemasi CafeJWTAuthentication uchun ham."""
+    target_class = "accounts.authentication.CafeJWTAuthentication"
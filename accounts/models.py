@@ -19,5 +19,22 @@ class User(AbstractUser):
         verbose_name = "Foydalanuvchi"
         verbose_name_plural = "Foydalanuvchilar"
 
+    def save(self, *args, **kwargs):
+        # token claim'laridan yig'ilgan user (accounts.authentication): rol/flag'lar keshdan —
+        # saqlash eskirgan qiymatlarni bazaga yozib yuborishi mumkin
+        if getattr(self, "_claims_user", False):
+            raise ValueError("Token claim'laridan yig'ilgan foydalanuvchini saqlab bo'lmaydi; User.objects.get() dan foydalaning.")
+        # accounts.permissions._role keshi eski rolni qaytarmasin
+        self.__dict__.pop("_cafe_role", None)
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, using=None, fields=None):
+        # token claim'laridan yig'ilgan user (accounts.authentication): birinchi deferred maydonga
+        # murojaatda qolganlari ham shu so'rovda yuklanadi
+        if fields is not None and getattr(self, "_from_claims", False):
+            fields = {*fields, *self.get_deferred_fields()}
+            self._from_claims = False
+        super().refresh_from_db(using=using, fields=fields)
+
     def __str__(self) -> str:
         return f"{self.username} ({self.get_role_display()})"
@@ -2,12 +2,21 @@ from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 
 def _role(user) -> str:
-    """Foydalanuvchi rolini qaytaradi. superuser/staff -> MANAGER."""
+    """
+    Foydalanuvchi rolini qaytaradi. superuser/staff -> MANAGER.
+    Natija user obyektida saqlanadi (bir so'rov ichida view va permission'lar qayta hisoblamaydi);
+    User.save() uni tozalaydi.
+    """
     if not user or not user.is_authenticated:
         return ""
-    if getattr(user, "is_superuser", False) or getattr(user, "is_staff", False):
-        return "MANAGER"
-    return getattr(user, "role", "")
+    role = getattr(user, "_cafe_role", None)
+    if role is None:
+        if getattr(user, "is_superuser", False) or getattr(user, "is_staff", False):
+            role = "MANAGER"
+        else:
+            role = getattr(user, "role", "")
+        user._cafe_role = role
+    return role
 
 
 class IsManager(BasePermission):
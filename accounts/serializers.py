@@ -12,6 +12,9 @@ class CafeTokenObtainPairSerializer(TokenObtainPairSerializer):
         token["user_id"] = user.id
         token["username"] = user.username
         token["role"] = getattr(user, "role", "")
+        # accounts.authentication.user_from_claims uchun (_role staff/superuser'ni ham hisobga oladi)
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
         return token
 
     def validate(self, attrs):
@@ -0,0 +1,121 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from orders.models import Order
+from .authentication import forget_user, user_from_claims
+from .models import User
+from .permissions import _role
+
+
+def _user_queries(ctx):
+	return [q["sql"] for q in ctx.captured_queries if f'FROM "{User._meta.db_table}"' in q["sql"]]
+
+
+class ClaimAuthenticationTests(TestCase):
+	def setUp(self):
+		forget_user()
+		self.waiter = User.objects.create_user(
+			username="waiter", password="pass", role=User.Role.WAITER, email="w@cafe.uz",
+		)
+		other = User.objects.create_user(username="other", password="pass", role=User.Role.WAITER)
+		Order.objects.create(order_type=Order.OrderType.TAKEAWAY, created_by=self.waiter)
+		Order.objects.create(order_type=Order.OrderType.TAKEAWAY, created_by=other)
+		self.client = APIClient()
+		r = self.client.post("/api/auth/login/", {"username": "waiter", "password": "pass"}, format="json")
+		self.assertEqual(r.status_code, 200)
+		self.access = r.data["access"]
+		self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+	def test_read_requests_use_token_claims(self):
+		token = AccessToken(self.access)
+		self.assertEqual((token["role"], token["is_staff"], token["is_superuser"]), ("WAITER", False, False))
+
+		self.client.get("/api/orders/")  # is_active keshga tushadi
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.get("/api/orders/")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(len(r.data["results"]), 1)  # WAITER filtri claim'dagi user bo'yicha
+		self.assertEqual(_user_queries(ctx), [])
+
+	def test_write_requests_and_me_load_user_row(self):
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.post("/api/orders/", {"order_type": "TAKEAWAY", "customer_name": "Ali"}, format="json")
+		self.assertNotEqual(_user_queries(ctx), [])
+		self.assertEqual(r.status_code, 201)
+
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.get("/api/auth/me/")
+		self.assertEqual(r.data["email"], "w@cafe.uz")
+		self.assertTrue(r.data["is_active"])
+		# is_active tekshiruvi + qolgan maydonlar bitta so'rovda
+		self.assertEqual(len(_user_queries(ctx)), 2)
+
+	@override_settings(JWT_STATELESS_AUTH=True)
+	def test_stateless_writes_skip_user_row(self):
+		self.client.get("/api/orders/")
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.post("/api/orders/", {"order_type": "TAKEAWAY", "customer_name": "Ali"}, format="json")
+		self.assertEqual(r.status_code, 201)
+		self.assertEqual(_user_queries(ctx), [])
+		self.assertEqual(Order.objects.get(pk=r.data["id"]).created_by, self.waiter)
+
+	def test_deactivated_user_rejected(self):
+		self.assertEqual(self.client.get("/api/orders/").status_code, 200)
+		self.waiter.is_active = False
+		self.waiter.save()  # signal shu jarayondagi keshni tozalaydi
+		self.assertEqual(self.client.get("/api/orders/").status_code, 401)
+
+	def test_deactivated_or_deleted_user_rejected_on_every_read_method(self):
+		self.waiter.is_active = False
+		self.waiter.save()
+		for method in (self.client.get, self.client.head, self.client.options):
+			r = method("/api/orders/")
+			self.assertEqual(r.status_code, 401)
+			self.assertEqual(r.data["code"], "user_inactive")
+		Order.objects.filter(created_by=self.waiter).delete()
+		self.waiter.delete()
+		r = self.client.get("/api/orders/")
+		self.assertEqual((r.status_code, r.data["code"]), (401, "user_not_found"))
+
+	@override_settings(JWT_USER_ACTIVE_TTL=0)
+	def test_active_flag_rechecked_after_ttl(self):
+		self.assertEqual(self.client.get("/api/orders/").status_code, 200)
+		User.objects.filter(pk=self.waiter.pk).update(is_active=False)  # signal'siz
+		self.assertEqual(self.client.get("/api/orders/").status_code, 401)
+
+	@override_settings(JWT_USER_ACTIVE_TTL=0)
+	def test_role_change_applies_before_token_expiry(self):
+		self.assertEqual(self.client.get("/api/orders/kitchen/").status_code, 403)
+		User.objects.filter(pk=self.waiter.pk).update(role=User.Role.CHEF)  # signal'siz
+		self.assertEqual(self.client.get("/api/orders/kitchen/").status_code, 200)
+		User.objects.filter(pk=self.waiter.pk).update(role=User.Role.WAITER, is_staff=True)
+		r = self.client.get("/api/orders/")
+		self.assertEqual(len(r.data["results"]), 2)  # staff -> MANAGER, claim'dagi WAITER emas
+
+	def test_claims_user_cannot_be_saved(self):
+		user = user_from_claims(AccessToken(self.access))
+		self.assertEqual(user.email, "w@cafe.uz")  # hydrate ham saqlashga ruxsat bermaydi
+		with self.assertRaises(ValueError):
+			user.save()
+
+	def test_token_without_role_claims_falls_back_to_db(self):
+		token = AccessToken.for_user(self.waiter)  # login'siz — faqat user_id
+		self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.get("/api/orders/")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(len(_user_queries(ctx)), 1)
+
+
+class RoleCacheTests(TestCase):
+	def test_role_memoized_until_save(self):
+		user = User.objects.create_user(username="chef", password="pass", role=User.Role.CHEF)
+		self.assertEqual(_role(user), "CHEF")
+		user.role = User.Role.WAITER
+		self.assertEqual(_role(user), "CHEF")
+		user.is_staff = True
+		user.save()
+		self.assertEqual(_role(user), "MANAGER")
@@ -0,0 +1,73 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from accounts.models import User
+from benchmarks import runner, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "API endpointlari benchmark'i: alohida test bazasini realistik hajmda to'ldiradi, "
+        "so'rovlar soni / p50 / p95 / sovuq kechikish / javob hajmini o'lchaydi va chegaralar bilan solishtiradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=100_000)
+        parser.add_argument("--items", type=int, default=500_000)
+        parser.add_argument("--payments", type=int, default=200_000)
+        parser.add_argument("--days", type=int, default=90)
+        parser.add_argument("--repeat", type=int, default=20, help="Har bir endpoint necha marta chaqiriladi.")
+        parser.add_argument("--output", default="benchmark_results.json", help="Natija JSON fayli.")
+        parser.add_argument("--thresholds", help="Chegaralar JSON fayli (standart: benchmarks/thresholds.json).")
+        parser.add_argument("--no-latency", action="store_true", help="p95 va sovuq kechikish chegaralarini tekshirmaslik.")
+        parser.add_argument(
+            "--keepdb", action="store_true",
+            help="Test bazasini saqlab qolish va to'ldirilgan bo'lsa qayta ishlatish (SQLite uchun TEST NAME kerak).",
+        )
+
+    def handle(self, *args, **options):
+        # Ish bazasiga tegmaslik uchun — test runner kabi alohida baza
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+                results = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+
+        width = max(len(name) for name in results)
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<{width}}  {r['status']}  {r['queries']:>3} q  "
+                f"p50 {r['p50_ms']:>8.2f} ms  p95 {r['p95_ms']:>8.2f} ms  cold {r['cold_ms']:>8.2f} ms  {r['bytes']:>8} B"
+            )
+        self.stdout.write(f"Natija: {options['output']}")
+
+        failures = runner.check(
+            results, runner.load_thresholds(options["thresholds"]), latency=not options["no_latency"],
+        )
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} ta regressiya.")
+        self.stdout.write(self.style.SUCCESS("Hammasi chegarada."))
+
+    def _run(self, options):
+        manager = User.objects.filter(username=seed.MANAGER_USERNAME).first()
+        if manager is None:
+            manager = seed.seed(
+                orders=options["orders"], items=options["items"], payments=options["payments"],
+                days=options["days"], log=self.stdout.write,
+            )
+        else:
+            self.stdout.write("Mavjud benchmark ma'lumotlari ishlatiladi (--keepdb).")
+        return runner.run(manager, repeat=options["repeat"])
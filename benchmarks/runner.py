@@ -0,0 +1,131 @@
+"""
+API endpointlari bo'yicha o'lchov: so'rovlar soni, p50/p95 va sovuq kechikish (ms), javob hajmi (bayt).
+
+Endpointlar config.api_urls.router dan avtomatik olinadi (list, detail, GET action'lar)
+va qo'lda ro'yxatdagi view'lar (menyu katalogi, hisobotlar) qo'shiladi.
+Natija thresholds.json bilan solishtiriladi — oshib ketsa regressiya.
+"""
+import json
+import math
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+THRESHOLDS_PATH = Path(__file__).with_name("thresholds.json")
+
+
+def _static_endpoints():
+    today = timezone.localdate()
+    week_ago = today - timedelta(days=6)
+    quarter_ago = today - timedelta(days=90)
+    return [
+        ("orders-list-expanded", "/api/orders/?expand=items,status_logs"),
+        ("menu-catalog", "/api/menu/catalog/"),
+        ("reports-daily", f"/api/reports/daily/?date={today}"),
+        ("reports-range", f"/api/reports/range/?date_from={week_ago}&date_to={today}"),
+        ("reports-range-90d", f"/api/reports/range/?date_from={quarter_ago}&date_to={today}"),
+        ("reports-waiter-stats", "/api/reports/waiter-stats/"),
+        ("reports-cache-stats", "/api/reports/cache-stats/"),
+        *(
+            (f"analytics-{name}", f"/api/reports/analytics/{name}/?date_from={quarter_ago}&date_to={today}")
+            for name in ("heatmap", "weekday", "basket-sizes", "co-occurrence")
+        ),
+    ]
+
+
+def collect_endpoints():
+    """[(nom, yo'l), ...] — har bir router endpointi uchun list/detail va GET action'lar."""
+    from config.api_urls import router
+
+    endpoints = []
+    for prefix, viewset, basename in router.registry:
+        endpoints.append((f"{basename}-list", f"/api/{prefix}/"))
+        pk = viewset.queryset.model.objects.order_by("-pk").values_list("pk", flat=True).first()
+        if pk is not None:
+            endpoints.append((f"{basename}-detail", f"/api/{prefix}/{pk}/"))
+        for extra in viewset.get_extra_actions():
+            if "get" not in extra.mapping:
+                continue
+            if extra.detail:
+                if pk is not None:
+                    endpoints.append((f"{basename}-{extra.url_name}", f"/api/{prefix}/{pk}/{extra.url_path}/"))
+            else:
+                endpoints.append((f"{basename}-{extra.url_name}", f"/api/{prefix}/{extra.url_path}/"))
+    return endpoints + _static_endpoints()
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def measure(client, path, repeat):
+    """
+    Birinchi chaqiruv sovuq kesh bilan; so'rovlar soni — eng katta qiymat.
+
+    p95 repeat=20 da yagona sovuq chaqiruvni tashlab yuboradi — u alohida `cold_ms` sifatida
+    `queries_cold` yonida yoziladi va o'z chegarasi bilan tekshiriladi.
+    """
+    # throttle hisoblagichi va javob keshlari endpointlar orasida ulashilmasin
+    cache.clear()
+    timings, queries, status, size = [], [], None, 0
+    for _ in range(repeat):
+        reset_queries()  # queries_log to'lib qolsa (9000) CaptureQueriesContext 0 ko'rsatadi
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = client.get(path)
+            if response.streaming:
+                content = b"".join(response.streaming_content)
+            else:
+                content = response.content
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(ctx.captured_queries))
+        status, size = response.status_code, len(content)
+    return {
+        "path": path,
+        "status": status,
+        "queries": max(queries),
+        "queries_cold": queries[0],
+        "cold_ms": round(timings[0], 2),
+        "p50_ms": round(_percentile(timings, 0.50), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+        "bytes": size,
+    }
+
+
+def run(user, repeat=20, endpoints=None):
+    client = APIClient()
+    client.force_authenticate(user)
+    return {name: measure(client, path, repeat) for name, path in (endpoints or collect_endpoints())}
+
+
+def load_thresholds(path=None):
+    with open(path or THRESHOLDS_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def check(results, thresholds, latency=True):
+    """Regressiyalar ro'yxati (bo'sh — hammasi chegarada)."""
+    failures = []
+    for name, limits in thresholds.items():
+        result = results.get(name)
+        if result is None:
+            failures.append(f"{name}: o'lchanmadi")
+            continue
+        if result["status"] != 200:
+            failures.append(f"{name}: HTTP {result['status']}")
+        if "max_queries" in limits and result["queries"] > limits["max_queries"]:
+            failures.append(f"{name}: {result['queries']} so'rov > {limits['max_queries']}")
+        if latency and "p95_ms" in limits and result["p95_ms"] > limits["p95_ms"]:
+            failures.append(f"{name}: p95 {result['p95_ms']} ms > {limits['p95_ms']} ms")
+        if latency and "cold_ms" in limits and result["cold_ms"] > limits["cold_ms"]:
+            failures.append(f"{name}: sovuq {result['cold_ms']} ms > {limits['cold_ms']} ms")
+        if "max_bytes" in limits and result["bytes"] > limits["max_bytes"]:
+            failures.append(f"{name}: {result['bytes']} bayt > {limits['max_bytes']}")
+    return failures
@@ -0,0 +1,203 @@
+"""
+Benchmark uchun realistik hajmdagi ma'lumot — lokal ORM orqali, bulk_create bilan.
+
+Shakllar seed_data.py / seed_data2.py / seed_orders.py / seed_payments.py dan olingan:
+7 kategoriya, 22 taom, 10 stol, DINE_IN/TAKEAWAY aralash buyurtmalar, CASH/CARD/QR to'lovlar.
+bulk_create signal yubormaydi: totals oldindan hisoblanadi, stol hisoblagichlari va
+kunlik jamlanmalar oxirida qayta quriladi.
+"""
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from accounts.models import User
+from expenses.models import Expense, ExpenseCategory
+from menu.models import Category, MenuItem
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from reports import rollup
+from tables.models import Table
+
+MENU = {
+    "Salatlar": [("Aralash salat", "18000"), ("Grek salatı", "22000"), ("Toshkent salatı", "20000")],
+    "Sho'rvalar": [("Mastava", "25000"), ("Lagmon", "30000"), ("Moshurhurda", "22000")],
+    "Asosiy taomlar": [("Kabob", "45000"), ("Tovuq grilli", "55000"), ("Qovurma go'sht", "50000")],
+    "Ichimliklar": [("Ko'k choy", "8000"), ("Qora choy", "8000"), ("Limonad", "15000"), ("Kompot", "10000")],
+    "Desertlar": [("Chak-chak", "20000"), ("Tort", "35000"), ("Muzqaymoq", "18000")],
+    "Fastfood": [("Burger", "32000"), ("Qovurilgan kartoshka", "15000"), ("Hot-dog", "22000")],
+    "Milliy taomlar": [("Osh (palov)", "35000"), ("Somsa", "12000"), ("Manti", "28000")],
+}
+TABLES = 10
+TAKEAWAY_CUSTOMERS = [
+    ("Akbar Sobirov", "+998901234567"),
+    ("Zulfiya Hasanova", "+998907654321"),
+    ("Mirzo Tursunov", "+998991112233"),
+]
+METHODS = (Payment.Method.CASH, Payment.Method.CASH, Payment.Method.CARD, Payment.Method.QR)
+EXPENSE_CATEGORIES = ("Oziq-ovqat", "Kommunal", "Ish haqi")
+
+# Ko'pchilik buyurtma yopilgan; ochiqlari oxirgi kunga to'g'ri keladi
+CLOSED_WEIGHTS = ((Order.Status.PAID, 90), (Order.Status.CANCELED, 10))
+OPEN_STATUSES = (Order.Status.NEW, Order.Status.COOKING, Order.Status.READY, Order.Status.SERVED)
+
+MANAGER_USERNAME = "bench_manager"
+
+
+@contextmanager
+def _manual_timestamps(*fields):
+    """auto_now_add ni vaqtincha o'chiradi — created_at/paid_at ni o'zimiz beramiz."""
+    saved = [(f, f.auto_now_add) for f in fields]
+    for f, _ in saved:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, value in saved:
+            f.auto_now_add = value
+
+
+def _spread(total, parts):
+    """total ni parts ta butun songa imkon qadar teng bo'ladi."""
+    base, extra = divmod(total, parts) if parts else (0, 0)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def _split_amount(amount, parts):
+    share = (amount / parts).quantize(Decimal("0.01"))
+    return [share] * (parts - 1) + [amount - share * (parts - 1)]
+
+
+def _user(username, role):
+    user = User(username=username, role=role)
+    user.set_unusable_password()
+    user.save()
+    return user
+
+
+def seed(orders=100_000, items=500_000, payments=200_000, days=90, open_orders=40,
+         batch_size=5_000, rng_seed=42, log=None):
+    rng = random.Random(rng_seed)
+    log = log or (lambda msg: None)
+    now = timezone.now()
+    start = now - timedelta(days=days)
+
+    manager = _user(MANAGER_USERNAME, User.Role.MANAGER)
+    waiters = [_user(f"bench_waiter_{i}", User.Role.WAITER) for i in range(1, 4)]
+    _user("bench_chef", User.Role.CHEF)
+
+    menu_items = []
+    for sort_order, (category_name, dishes) in enumerate(MENU.items()):
+        category = Category.objects.create(name=category_name, sort_order=sort_order)
+        for name, price in dishes:
+            menu_items.append(MenuItem.objects.create(category=category, name=name, price=Decimal(price)))
+    tables = [Table.objects.create(number=n) for n in range(1, TABLES + 1)]
+
+    items_per_order = _spread(items, orders)
+    log(f"Buyurtmalar: {orders}, elementlar: {items}, to'lovlar: {payments}")
+
+    order_fields = (Order._meta.get_field("created_at"),)
+    item_fields = (OrderItem._meta.get_field("created_at"),)
+    payment_fields = (Payment._meta.get_field("paid_at"),)
+    with _manual_timestamps(*order_fields, *item_fields, *payment_fields), transaction.atomic():
+        paid_orders = []
+        for offset in range(0, orders, batch_size):
+            chunk = range(offset, min(offset + batch_size, orders))
+            batch, batch_items = [], []
+            for i in chunk:
+                is_open = i >= orders - open_orders
+                created_at = now - timedelta(minutes=rng.randint(1, 180)) if is_open else (
+                    start + timedelta(seconds=rng.randint(0, days * 86400 - 1))
+                )
+                if is_open:
+                    status = rng.choice(OPEN_STATUSES)
+                else:
+                    status = rng.choices([s for s, _ in CLOSED_WEIGHTS], [w for _, w in CLOSED_WEIGHTS])[0]
+
+                lines = []
+                for _ in range(items_per_order[i]):
+                    menu_item = rng.choice(menu_items)
+                    qty = rng.randint(1, 4)
+                    lines.append((menu_item, qty, menu_item.price * qty))
+                total = sum((line for _, _, line in lines), Decimal("0.00"))
+
+                order = Order(
+                    order_code=uuid.uuid4().hex[:12].upper(),
+                    created_by=rng.choice(waiters),
+                    status=status,
+                    subtotal=total,
+                    total=total,
+                    paid_total=total if status == Order.Status.PAID else Decimal("0.00"),
+                    due_amount=Decimal("0.00") if status == Order.Status.PAID else total,
+                    is_closed=status in (Order.Status.PAID, Order.Status.CANCELED),
+                    change_seq=int(created_at.timestamp() * 1_000_000),
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                if rng.random() < 0.8:
+                    order.order_type = Order.OrderType.DINE_IN
+                    order.table = rng.choice(tables)
+                else:
+                    order.order_type = Order.OrderType.TAKEAWAY
+                    order.customer_name, order.customer_phone = rng.choice(TAKEAWAY_CUSTOMERS)
+                batch.append(order)
+                batch_items.append(lines)
+
+            Order.objects.bulk_create(batch)
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order=order, menu_item=menu_item, item_name_snapshot=menu_item.name,
+                        unit_price_snapshot=menu_item.price, qty=qty, line_total=line_total,
+                        created_at=order.created_at,
+                    )
+                    for order, lines in zip(batch, batch_items)
+                    for menu_item, qty, line_total in lines
+                ],
+                batch_size=batch_size,
+            )
+            paid_orders.extend(o for o in batch if o.status == Order.Status.PAID and o.total > 0)
+            log(f"  {chunk.stop}/{orders} buyurtma")
+
+        # to'lovlar PAID buyurtmalarga bo'lib beriladi (bir hisob — bir nechta to'lov)
+        payments_per_order = _spread(payments, len(paid_orders))
+        batch = []
+        for order, count in zip(paid_orders, payments_per_order):
+            if not count:
+                continue
+            for n, amount in enumerate(_split_amount(order.total, count)):
+                batch.append(Payment(
+                    order=order, received_by=rng.choice((manager, *waiters)), method=rng.choice(METHODS),
+                    amount=amount, paid_at=order.created_at + timedelta(minutes=40 + n),
+                ))
+            if len(batch) >= batch_size:
+                Payment.objects.bulk_create(batch)
+                batch = []
+        Payment.objects.bulk_create(batch)
+
+        expense_categories = [ExpenseCategory.objects.create(name=name) for name in EXPENSE_CATEGORIES]
+        Expense.objects.bulk_create([
+            Expense(
+                category=rng.choice(expense_categories), created_by=manager,
+                amount=Decimal(rng.randint(50, 500) * 1000), spent_at=start + timedelta(days=d, hours=9),
+            )
+            for d in range(days) for _ in range(3)
+        ])
+
+        for table in Table.objects.annotate(
+            open_orders=Count("orders", filter=~Q(orders__status__in=(Order.Status.PAID, Order.Status.CANCELED)))
+        ):
+            Table.objects.filter(pk=table.pk).update(
+                active_order_count=table.open_orders,
+                status=Table.Status.OCCUPIED if table.open_orders else Table.Status.FREE,
+            )
+
+    log("Kunlik jamlanmalar qayta qurilmoqda...")
+    for day in rollup.iter_days(timezone.localdate(start), timezone.localdate(now)):
+        rollup.rebuild_day(day)
+    return manager
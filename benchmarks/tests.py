@@ -0,0 +1,33 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from reports import rollup
+from . import runner, seed
+
+
+class BenchmarkSuiteTests(TestCase):
+	"""Kichik hajmda: barcha endpointlar 200 va so'rovlar soni thresholds.json chegarasida."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.manager = seed.seed(orders=60, items=240, payments=80, days=3, open_orders=10, batch_size=25)
+
+	def test_seed_shapes(self):
+		self.assertEqual(Order.objects.count(), 60)
+		self.assertEqual(OrderItem.objects.count(), 240)
+		self.assertEqual(Payment.objects.count(), 80)
+		day = timezone.localdate(Order.objects.order_by("created_at").first().created_at)
+		self.assertEqual(rollup.stored_day(day), rollup.compute_day(day))
+
+	def test_endpoints_within_query_thresholds(self):
+		results = runner.run(self.manager, repeat=2)
+		self.assertEqual(runner.check(results, runner.load_thresholds(), latency=False), [])
+
+	def test_cold_latency_has_its_own_threshold(self):
+		# p95 sovuq chaqiruvni yashiradi — cold_ms alohida tekshiriladi
+		results = {"menu-catalog": {"status": 200, "queries": 1, "p95_ms": 1.0, "cold_ms": 900.0, "bytes": 10}}
+		limits = {"menu-catalog": {"p95_ms": 50, "cold_ms": 300}}
+		self.assertEqual(runner.check(results, limits), ["menu-catalog: sovuq 900.0 ms > 300 ms"])
+		self.assertEqual(runner.check(results, limits, latency=False), [])
@@ -2,12 +2,16 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
-from menu.views import CategoryViewSet, MenuItemViewSet
+from menu.views import CategoryViewSet, MenuItemViewSet, MenuCatalogView
 from tables.views import TableViewSet
 from orders.views import OrderViewSet
+from orders.streams import OrderEventsTicketView, order_events
 from payments.views import PaymentViewSet
 from expenses.views import ExpenseCategoryViewSet, ExpenseViewSet
-from reports.views import DailyReportView, RangeReportView, WaiterStatsView
+from reports.views import (
+    DailyReportView, RangeReportView, WaiterStatsView, ReportCacheStatsView,
+    HeatmapView, WeekdayPatternView, BasketSizeView, CoOccurrenceView,
+)
 
 router = DefaultRouter()
 router.register(r"categories", CategoryViewSet, basename="category")
@@ -19,12 +23,21 @@ router.register(r"expense-categories", ExpenseCategoryViewSet, basename="expense
 router.register(r"expenses", ExpenseViewSet, basename="expense")
 
 urlpatterns = [
+    # router'dan oldin: aks holda orders/<pk>/ sifatida tushadi
+    path("orders/events/", order_events, name="order-events"),
+    path("orders/events/ticket/", OrderEventsTicketView.as_view(), name="order-events-ticket"),
     path("", include(router.urls)),
     # OpenAPI schema and interactive docs
     path("schema/", SpectacularAPIView.as_view(), name="schema"),
     path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     path("docs/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
+    path("menu/catalog/", MenuCatalogView.as_view(), name="menu-catalog"),
     path("reports/daily/", DailyReportView.as_view(), name="report-daily"),
     path("reports/range/", RangeReportView.as_view(), name="report-range"),
     path("reports/waiter-stats/", WaiterStatsView.as_view(), name="report-waiter-stats"),
+    path("reports/cache-stats/", ReportCacheStatsView.as_view(), name="report-cache-stats"),
+    path("reports/analytics/heatmap/", HeatmapView.as_view(), name="report-analytics-heatmap"),
+    path("reports/analytics/weekday/", WeekdayPatternView.as_view(), name="report-analytics-weekday"),
+    path("reports/analytics/basket-sizes/", BasketSizeView.as_view(), name="report-analytics-basket-sizes"),
+    path("reports/analytics/co-occurrence/", CoOccurrenceView.as_view(), name="report-analytics-co-occurrence"),
 ]
@@ -0,0 +1,30 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def day_start(d):
+    """Kafe vaqt zonasida (settings.TIME_ZONE — Asia/Tashkent) kun boshlanishi, aware datetime."""
+    return timezone.make_aware(datetime.combine(d, time.min), timezone.get_default_timezone())
+
+
+def date_window(date_from=None, date_to=None):
+    """
+    date_from/date_to (ikkalasi ham kiritiladi) -> yarim ochiq [start, end) oraliq.
+    Chegara berilmasa None qaytadi.
+    """
+    start = day_start(date_from) if date_from else None
+    end = day_start(date_to + timedelta(days=1)) if date_to else None
+    return start, end
+
+
+def filter_date_window(qs, field, date_from=None, date_to=None):
+    """
+    `field__date` lookup o'rniga oddiy range predikat — ustundagi indeks ishlaydi.
+    """
+    start, end = date_window(date_from, date_to)
+    if start is not None:
+        qs = qs.filter(**{f"{field}__gte": start})
+    if end is not None:
+        qs = qs.filter(**{f"{field}__lt": end})
+    return qs
@@ -0,0 +1,202 @@
+"""
+Oqimli (streaming) eksport: CSV va XLSX, model obyektlari va serializer'siz.
+
+ExportMixin viewset'ga GET {prefix}/export/?file_format=csv|xlsx qo'shadi. Qatorlar
+filter_queryset(get_queryset()) dan `.values_list(...).iterator(chunk_size=...)` bilan olinadi,
+ya'ni list bilan bir xil filtrlar va rol cheklovlari (masalan WAITER — faqat o'z to'lovlari).
+Xotira qatorlar soniga bog'liq emas: har bir qator yozilishi bilan client'ga uzatiladi.
+
+XLSX tashqi kutubxonasiz yoziladi: zipfile seek qilinmaydigan oqimga ham yoza oladi,
+varaq XML'i qatorma-qator siqiladi.
+"""
+import csv
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from django.utils import timezone
+from rest_framework import status as http_status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Excel/LibreOffice CSV'dagi shu belgilar bilan boshlangan matnni formula deb bajaradi (CSV injection).
+# Telefon raqamlari / oddiy sonlar (+998 90 123-45-67, -5) formula emas — tegilmaydi.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_PLAIN_NUMBER = re.compile(r"^[+-]?[\d\s()-]+$")
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def _csv_cell(value):
+    value = _cell(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES) and not _PLAIN_NUMBER.match(value):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """csv.writer uchun: yozilgan qatorni qaytaradi (Django hujjatidagi pseudo-buffer)."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows):
+    writer = csv.writer(_Echo())
+    # BOM — Excel UTF-8 (o'zbekcha matn) ni to'g'ri ochishi uchun
+    yield "\ufeff" + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_cell(v) for v in row])
+
+
+# ── XLSX ──
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _xlsx_cell(value):
+    value = _cell(value)
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f"<c><v>{value}</v></c>"
+    if value == "":
+        return "<c/>"
+    return f'<c t="inlineStr"><is><t>{escape(_ILLEGAL_XML.sub("", str(value)))}</t></is></c>'
+
+
+def _xlsx_row(row):
+    return "<row>" + "".join(_xlsx_cell(v) for v in row) + "</row>"
+
+
+class _Pipe:
+    """Seek qilinmaydigan yozish oqimi: zipfile yozganini generator olib ketadi."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def xlsx_stream(header, rows, sheet_name="Sheet1", flush_every=1000):
+    pipe = _Pipe()
+    zf = zipfile.ZipFile(pipe, "w", compression=zipfile.ZIP_DEFLATED)
+    zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+    zf.writestr("_rels/.rels", _ROOT_RELS)
+    zf.writestr("xl/workbook.xml", _WORKBOOK.format(name=escape(sheet_name[:31])))
+    zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+    with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+        sheet.write((_SHEET_HEAD + _xlsx_row(header)).encode())
+        for n, row in enumerate(rows, 1):
+            sheet.write(_xlsx_row(row).encode())
+            if n % flush_every == 0 and pipe.chunks:
+                yield pipe.drain()
+        sheet.write(_SHEET_TAIL.encode())
+    zf.close()  # central directory
+    yield pipe.drain()
+
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", csv_stream),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", xlsx_stream),
+}
+
+
+class ExportMixin:
+    """
+    export_fields = (("Sarlavha", "lookup"), ...) — values_list uchun lookup'lar.
+    export_filename — fayl nomi (kengaytmasiz).
+    """
+    export_fields = ()
+    export_filename = "export"
+
+    @extend_schema(
+        parameters=[OpenApiParameter("file_format", enum=list(FORMATS), default="csv")],
+        responses={(200, "*/*"): OpenApiTypes.BINARY},
+    )
+    @action(detail=False, methods=["get"], url_path="export", pagination_class=None)
+    def export(self, request):
+        """List bilan bir xil filtrlar bo'yicha CSV/XLSX fayl (oqim bilan, sahifalashsiz)."""
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in FORMATS:
+            return Response(
+                {"detail": "file_format faqat csv yoki xlsx bo'lishi mumkin."},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        content_type, writer = FORMATS[file_format]
+
+        header = [title for title, _ in self.export_fields]
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .values_list(*(lookup for _, lookup in self.export_fields))
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        response = StreamingHttpResponse(writer(header, rows), content_type=content_type)
+        filename = f"{self.export_filename}-{timezone.localdate():%Y%m%d}.{file_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,142 @@
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    (vaqt, id) bo'yicha keyset (cursor) pagination — COUNT(*) va OFFSET yo'q.
+
+    View `keyset_fields = ("created_at", "id")` ni belgilaydi; tartib doim kamayuvchi.
+    Eski page-number clientlar uchun: ?page=N bo'lsa PageNumberPagination ishlaydi.
+    ?ordering= berilsa ham PageNumberPagination — keyset tartibi OrderingFilter'ni bekor qilmaydi.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_query_param = "page"
+    invalid_cursor_message = "Cursor noto'g'ri."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        params = request.query_params
+        if self.page_query_param in params or params.get(api_settings.ORDERING_PARAM):
+            self.fallback = PageNumberPagination()
+            self.fallback.page_size_query_param = self.page_size_query_param
+            self.fallback.max_page_size = self.max_page_size
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        rows = list(self.keyset_queryset(queryset, request, view)[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def keyset_queryset(self, queryset, request, view=None):
+        """Cursor'dan keyingi qatorlar, (vaqt, id) kamayuvchi — LIMIT'siz (EXPLAIN testlari uchun ham)."""
+        self.time_field, self.id_field = getattr(view, "keyset_fields", ("created_at", "id"))
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            ts, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f"{self.time_field}__lt": ts})
+                | Q(**{self.time_field: ts, f"{self.id_field}__lt": pk})
+            )
+        return queryset.order_by(f"-{self.time_field}", f"-{self.id_field}")
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+            except ValueError:
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            ts_str, pk_str = raw.rsplit("|", 1)
+            ts = parse_datetime(ts_str)
+            pk = int(pk_str)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if ts is None:
+            raise NotFound(self.invalid_cursor_message)
+        return ts, pk
+
+    def encode_cursor(self, obj):
+        ts = getattr(obj, self.time_field)
+        pk = getattr(obj, self.id_field)
+        raw = f"{ts.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("first", self.get_first_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Keyingi sahifa uchun cursor (javobdagi `next`).",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Sahifadagi natijalar soni.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.page_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Eski page-number rejimi (COUNT bilan); ?ordering= bilan ham shu rejim.",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -65,12 +65,15 @@ INSTALLED_APPS = [
     "payments",
     "expenses",
     "reports",
+    "benchmarks",
 ]
 
 # =========================
 # MIDDLEWARE
 # =========================
 MIDDLEWARE = [
+    # REQUEST_TIMING_ENABLED=False bo'lsa o'zini zanjirdan olib tashlaydi
+    "config.timing.RequestTimingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -119,6 +122,60 @@ else:
         }
     }
 
+# =========================
+# CACHE
+# =========================
+# CACHE_URL misollari: locmemcache://, filecache:///var/tmp/cafe_cache, redis://127.0.0.1:6379/1
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Hisobotlar keshi (kalit bazadagi jamlanmalardan — reports.cache): bugungi kun va o'tgan kunlar TTL (soniya)
+REPORT_CACHE_ALIAS = "default"
+REPORT_CACHE_TODAY_TTL = env.int("REPORT_CACHE_TODAY_TTL", default=60)
+REPORT_CACHE_PAST_TTL = env.int("REPORT_CACHE_PAST_TTL", default=3600)
+# Davr hisobotlari (range/analytics) uchun eng uzun davr (kun)
+REPORT_MAX_RANGE_DAYS = env.int("REPORT_MAX_RANGE_DAYS", default=366)
+
+# Oshxona navbati long-poll (?since=&wait=): ?wait= ning yuqori chegarasi va tekshirish oralig'i (soniya).
+# Standart wait=0 — sync worker faqat mijoz so'raganda band qilinadi
+KITCHEN_LONG_POLL_TIMEOUT = env.int("KITCHEN_LONG_POLL_TIMEOUT", default=20)
+KITCHEN_LONG_POLL_INTERVAL = 1.0
+# ?since= oynasi: cursor'dan shuncha soniya oldingi change_seq ham qayta o'qiladi — belgi
+# commit'dan oldin olinadi, shu muddatdan uzoq davom etgan tranzaksiya o'zgarishi ko'rinmay qolishi mumkin
+KITCHEN_CURSOR_LAG = env.int("KITCHEN_CURSOR_LAG", default=5)
+
+# Buyurtma hodisalari (SSE /api/orders/events/) — faqat ASGI (config.asgi) ostida; WSGI'da 503.
+# Bir nechta jarayon bo'lsa — tashqi broker klassi. TICKET_TTL — ?ticket= amal qilish muddati (soniya)
+ORDER_EVENTS_BROKER = env("ORDER_EVENTS_BROKER", default="orders.events.InProcessBroker")
+ORDER_EVENTS_HEARTBEAT = 15
+ORDER_EVENTS_TICKET_TTL = env.int("ORDER_EVENTS_TICKET_TTL", default=30)
+# Oqimning eng uzun umri (soniya) — Django 4.2 uzilishni sezmaydi, client `retry:` bilan qayta ulanadi
+ORDER_EVENTS_MAX_LIFETIME = env.int("ORDER_EVENTS_MAX_LIFETIME", default=300)
+
+# So'rov o'lchovi (config.timing): Server-Timing header + "config.timing" logger.
+# SAMPLE_RATE — o'lchanadigan so'rovlar ulushi (0..1); SLOW_QUERY_MS dan uzoq SQL alohida log
+REQUEST_TIMING_ENABLED = env.bool("REQUEST_TIMING_ENABLED", default=False)
+REQUEST_TIMING_SAMPLE_RATE = env.float("REQUEST_TIMING_SAMPLE_RATE", default=1.0)
+REQUEST_TIMING_SLOW_QUERY_MS = env.float("REQUEST_TIMING_SLOW_QUERY_MS", default=100)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "config.timing": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+# Buyurtma kiritishda MenuItem ma'lumotlari uchun jarayon ichidagi LRU kesh (menu.lookup) hajmi
+MENU_ITEM_CACHE_SIZE = env.int("MENU_ITEM_CACHE_SIZE", default=2048)
+# ... va yozuvlar muddati (soniya): boshqa worker'dagi narx/mavjudlik o'zgarishi shu muddatda ko'rinadi
+MENU_ITEM_CACHE_TTL = env.int("MENU_ITEM_CACHE_TTL", default=5)
+# Menyu katalogi keshi (kalit versiyalangan — muddat faqat eski versiyalarni tozalaydi)
+MENU_CATALOG_CACHE_TTL = env.int("MENU_CATALOG_CACHE_TTL", default=3600)
+
+# Zal sxemasi (/api/tables/floor/) — rol bo'yicha qisqa muddatli kesh (soniya)
+TABLE_FLOOR_CACHE_TTL = env.int("TABLE_FLOOR_CACHE_TTL", default=2)
+
 # =========================
 # AUTH
 # =========================
@@ -159,7 +216,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # =========================
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CafeJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -189,6 +246,13 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# accounts.authentication: True bo'lsa yozish so'rovlarida ham user token claim'laridan olinadi
+# (GET/HEAD/OPTIONS doim shunday). is_active va rol (role/is_staff/is_superuser) jarayon ichida
+# ACTIVE_TTL soniya keshlanadi — bloklash yoki rol o'zgarishi boshqa worker'larda ko'pi bilan
+# shuncha vaqt o'tib kuchga kiradi.
+JWT_STATELESS_AUTH = env.bool("JWT_STATELESS_AUTH", default=False)
+JWT_USER_ACTIVE_TTL = env.int("JWT_USER_ACTIVE_TTL", default=30)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Cafe API",
     "DESCRIPTION": "Kafe boshqaruv tizimi uchun REST API",
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import zipfile
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from expenses.models import Expense, ExpenseCategory
+from menu.models import Category, MenuItem
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from tables.models import Table
+
+
+class RequestTimingMiddlewareTests(TestCase):
+	def setUp(self):
+		self.user = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		Table.objects.create(number=1)
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_disabled_by_default(self):
+		r = self.client.get("/api/tables/")
+		self.assertEqual(r.status_code, 200)
+		self.assertNotIn("Server-Timing", r)
+
+	@override_settings(REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_SLOW_QUERY_MS=10_000)
+	def test_server_timing_header_and_log_line(self):
+		with self.assertLogs("config.timing", "INFO") as logs:
+			r = self.client.get("/api/tables/")
+		self.assertEqual(r.status_code, 200)
+		self.assertRegex(r["Server-Timing"], r'^db;dur=[\d.]+;desc="2 queries", ser;dur=[\d.]+, view;dur=[\d.]+$')
+
+		self.assertEqual(len(logs.records), 1)
+		line = json.loads(logs.records[0].getMessage())
+		self.assertEqual(line["route"], "table-list")
+		self.assertEqual(line["queries"], 2)
+		self.assertGreater(line["serializer_ms"], 0)
+
+	@override_settings(REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_SLOW_QUERY_MS=0)
+	def test_slow_queries_logged_separately(self):
+		with self.assertLogs("config.timing", "WARNING") as logs:
+			self.client.get("/api/tables/")
+		slow = [json.loads(r.getMessage()) for r in logs.records]
+		self.assertEqual(len(slow), 2)
+		self.assertIn("tables_table", slow[-1]["sql"])
+
+	@override_settings(REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_SAMPLE_RATE=0.0)
+	def test_unsampled_requests_untouched(self):
+		r = self.client.get("/api/tables/")
+		self.assertNotIn("Server-Timing", r)
+
+
+class StreamingExportTests(TestCase):
+	def setUp(self):
+		self.manager = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		self.waiter = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		item = MenuItem.objects.create(category=Category.objects.create(name="Drinks"), name="Choy", price=Decimal("5.00"))
+		for user in (self.manager, self.waiter):
+			order = Order.objects.create(order_type=Order.OrderType.TAKEAWAY, customer_name="Ali, \"aka\"", created_by=user)
+			OrderItem.objects.create(order=order, menu_item=item, qty=2)
+			Payment.objects.create(order=order, received_by=user, method=Payment.Method.CASH, amount=Decimal("10.00"))
+		category = ExpenseCategory.objects.create(name="Kommunal")
+		Expense.objects.create(category=category, created_by=self.manager, amount=Decimal("7.00"), spent_at=timezone.now())
+		self.client = APIClient()
+		self.client.force_authenticate(self.manager)
+
+	def _csv(self, response):
+		body = b"".join(response.streaming_content).decode("utf-8-sig")
+		return list(csv.reader(io.StringIO(body)))
+
+	def test_orders_csv_streams_with_list_filters(self):
+		with self.assertNumQueries(1):
+			r = self.client.get("/api/orders/export/?search=Ali")
+			rows = self._csv(r)
+		self.assertTrue(r.streaming)
+		self.assertIn("buyurtmalar-", r["Content-Disposition"])
+		self.assertEqual(rows[0][:2], ["ID", "Kod"])
+		self.assertEqual(len(rows), 3)
+		self.assertEqual(rows[1][5], 'Ali, "aka"')
+		self.assertEqual(rows[1][10], "10.00")
+
+		rows = self._csv(self.client.get("/api/orders/export/?search=yo'q"))
+		self.assertEqual(len(rows), 1)
+
+	def test_text_cells_cannot_start_a_formula(self):
+		Order.objects.create(order_type=Order.OrderType.TAKEAWAY, customer_name='=HYPERLINK("http://x","y")', created_by=self.manager)
+		Order.objects.create(
+			order_type=Order.OrderType.TAKEAWAY, customer_name="@SUM(A1)", customer_phone="+998 90 123-45-67", created_by=self.manager,
+		)
+		rows = self._csv(self.client.get("/api/orders/export/?ordering=id"))
+		names = [row[5] for row in rows[1:]]
+		self.assertIn("'=HYPERLINK(\"http://x\",\"y\")", names)
+		self.assertIn("'@SUM(A1)", names)
+		self.assertIn('Ali, "aka"', names)
+		self.assertEqual(rows[-1][6], "+998 90 123-45-67")
+		self.assertEqual(rows[1][10], "10.00")
+
+		# XLSX inline string hech qachon formula sifatida bajarilmaydi — o'zgartirilmaydi
+		r = self.client.get("/api/orders/export/?file_format=xlsx&ordering=id")
+		sheet = zipfile.ZipFile(io.BytesIO(b"".join(r.streaming_content))).read("xl/worksheets/sheet1.xml").decode()
+		self.assertIn("<t>@SUM(A1)</t>", sheet)
+		self.assertIn("<t>+998 90 123-45-67</t>", sheet)
+
+	def test_payments_xlsx_scoped_for_waiter(self):
+		self.client.force_authenticate(self.waiter)
+		r = self.client.get("/api/payments/export/?file_format=xlsx")
+		self.assertEqual(r.status_code, 200)
+		archive = zipfile.ZipFile(io.BytesIO(b"".join(r.streaming_content)))
+		self.assertIsNone(archive.testzip())
+		sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+		self.assertEqual(sheet.count("<row>"), 2)  # sarlavha + o'z to'lovi
+		self.assertIn("<t>waiter</t>", sheet)
+		self.assertNotIn("<t>manager</t>", sheet)
+
+	def test_expenses_export_manager_only_and_format_validated(self):
+		self.assertEqual(self.client.get("/api/expenses/export/?file_format=pdf").status_code, 400)
+		rows = self._csv(self.client.get("/api/expenses/export/"))
+		self.assertEqual(rows[1][1:3], ["Kommunal", "7.00"])
+
+		self.client.force_authenticate(self.waiter)
+		self.assertEqual(self.client.get("/api/expenses/export/").status_code, 403)
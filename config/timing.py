@@ -0,0 +1,131 @@
+"""
+So'rov bo'yicha SQL va vaqt o'lchovi (RequestTimingMiddleware).
+
+Yoqilganda har bir (tanlangan) so'rov uchun:
+- DB so'rovlar soni va umumiy vaqti — connection.execute_wrapper orqali;
+- serializer vaqti — Serializer.data / ListSerializer.data atrofida (ichidagi lazy DB ham shu yerda);
+- view vaqti — middleware'dan keyingi butun zanjir (render bilan).
+
+Natija `Server-Timing` header'ida va "config.timing" logger'ida JSON qator sifatida
+(route nomi — config/api_urls.py dagi name / router basename). Sekin SQL alohida WARNING.
+REQUEST_TIMING_ENABLED=False bo'lsa middleware umuman yuklanmaydi (MiddlewareNotUsed).
+"""
+import contextvars
+import functools
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger("config.timing")
+
+_current = contextvars.ContextVar("request_timing", default=None)
+
+
+class _RequestStats:
+    __slots__ = ("queries", "db", "serializer", "depth", "slow")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.depth = 0
+        self.slow = []
+
+
+def _timed_data(getter):
+    @functools.wraps(getter)
+    def data(self):
+        stats = _current.get()
+        # ichma-ich serializer (masalan SerializerMethodField ichida) ikki marta sanalmaydi
+        if stats is None or stats.depth:
+            return getter(self)
+        stats.depth += 1
+        started = time.perf_counter()
+        try:
+            return getter(self)
+        finally:
+            stats.serializer += time.perf_counter() - started
+            stats.depth -= 1
+
+    data._request_timing = True
+    return property(data)
+
+
+def install_serializer_timing():
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(cls.data.fget, "_request_timing", False):
+            cls.data = _timed_data(cls.data.fget)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_TIMING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        self.slow_query_seconds = settings.REQUEST_TIMING_SLOW_QUERY_MS / 1000
+        install_serializer_timing()
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        stats = _RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(self._make_wrapper(stats, conn.alias)))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={stats.db * 1000:.1f};desc="{stats.queries} queries"',
+            f"ser;dur={stats.serializer * 1000:.1f}",
+            f"view;dur={total * 1000:.1f}",
+        ])
+        self._log(request, response, stats, total)
+        return response
+
+    def _make_wrapper(self, stats, alias):
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed = time.perf_counter() - started
+                stats.queries += 1
+                stats.db += elapsed
+                if elapsed >= self.slow_query_seconds:
+                    stats.slow.append((alias, elapsed, sql))
+        return wrapper
+
+    def _log(self, request, response, stats, total):
+        match = request.resolver_match
+        route = match.view_name if match else request.path
+        logger.info(json.dumps({
+            "route": route,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": stats.queries,
+            "db_ms": round(stats.db * 1000, 2),
+            "serializer_ms": round(stats.serializer * 1000, 2),
+            "view_ms": round(total * 1000, 2),
+        }))
+        for alias, elapsed, sql in stats.slow:
+            logger.warning(json.dumps({
+                "route": route,
+                "slow_query_ms": round(elapsed * 1000, 2),
+                "db": alias,
+                "sql": sql[:500],
+            }))
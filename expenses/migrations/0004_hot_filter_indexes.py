@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0003_alter_expense_options_alter_expensecategory_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['spent_at'], name='expense_spent_idx'),
+        ),
+    ]
@@ -41,6 +41,9 @@ class Expense(models.Model):
         ordering            = ["-spent_at"]
         verbose_name        = "Xarajat"
         verbose_name_plural = "Xarajatlar"
+        indexes = [
+            models.Index(fields=["spent_at"], name="expense_spent_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.category.name}: {self.amount}"
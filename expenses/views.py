@@ -2,6 +2,9 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from django.utils.dateparse import parse_date
 
+from config.dates import filter_date_window
+from config.export import ExportMixin
+from config.pagination import KeysetPagination
 from accounts.permissions import IsManager
 from .models import ExpenseCategory, Expense
 from .serializers import ExpenseCategorySerializer, ExpenseSerializer
@@ -15,11 +18,18 @@ class ExpenseCategoryViewSet(ModelViewSet):
     ordering_fields = ["name", "id"]
 
 
-class ExpenseViewSet(ModelViewSet):
+class ExpenseViewSet(ExportMixin, ModelViewSet):
     queryset = Expense.objects.select_related("category", "created_by").all()
     serializer_class = ExpenseSerializer
+    pagination_class = KeysetPagination
+    keyset_fields = ("spent_at", "id")
     permission_classes = [IsAuthenticated, IsManager]
     ordering_fields = ["spent_at", "amount", "id"]
+    export_filename = "xarajatlar"
+    export_fields = (
+        ("ID", "id"), ("Kategoriya", "category__name"), ("Miqdori", "amount"), ("Izoh", "comment"),
+        ("Kim tomonidan", "created_by__username"), ("Xarajat sanasi", "spent_at"),
+    )
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -30,14 +40,11 @@ class ExpenseViewSet(ModelViewSet):
 
         if category:
             qs = qs.filter(category_id=category)
-        if date_from:
-            d1 = parse_date(date_from)
-            if d1:
-                qs = qs.filter(spent_at__date__gte=d1)
-        if date_to:
-            d2 = parse_date(date_to)
-            if d2:
-                qs = qs.filter(spent_at__date__lte=d2)
+        qs = filter_date_window(
+            qs, "spent_at",
+            parse_date(date_from) if date_from else None,
+            parse_date(date_to) if date_to else None,
+        )
         return qs
 
     def perform_create(self, serializer):
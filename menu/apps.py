@@ -5,3 +5,6 @@ class MenuConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "menu"
     verbose_name = "🍽️ Menyu"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,42 @@
+"""
+Ofitsiant qurilmalari uchun to'liq menyu katalogi (faol kategoriyalar + mavjud elementlar).
+
+Versiya bazadan olinadi (Category/MenuItem: Max(updated_at) + qatorlar soni), shuning uchun
+barcha worker'larda bir xil va har qanday yo'l bilan (admin, queryset.update(updated_at=...),
+o'chirish) o'zgarganda almashadi. Natija kesh'da `version` bo'yicha MENU_CATALOG_CACHE_TTL
+muddatga saqlanadi. Versiya ETag sifatida qaytariladi.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Prefetch
+
+from .models import Category, MenuItem
+
+
+def get_version():
+    state = [
+        tuple(model.objects.aggregate(n=Count("id"), at=Max("updated_at")).values())
+        for model in (Category, MenuItem)
+    ]
+    return hashlib.md5(repr(state).encode()).hexdigest()[:16]
+
+
+def build_catalog(request):
+    from .serializers import CatalogCategorySerializer
+
+    categories = Category.objects.filter(is_active=True).prefetch_related(
+        Prefetch("items", queryset=MenuItem.objects.filter(is_available=True).order_by("name"))
+    )
+    return CatalogCategorySerializer(categories, many=True, context={"request": request}).data
+
+
+def get_catalog(request, version):
+    # image_url absolyut — shuning uchun kalitda host ham bor
+    key = f"menu:catalog:{version}:{request.build_absolute_uri('/')}"
+    data = cache.get(key)
+    if data is None:
+        data = build_catalog(request)
+        cache.set(key, data, timeout=settings.MENU_CATALOG_CACHE_TTL)
+    return data
@@ -0,0 +1,61 @@
+"""
+Buyurtma kiritish yo'li uchun MenuItem ma'lumotlari: jarayon ichidagi LRU kesh.
+
+id -> MenuItemInfo(id, name, price, is_available, category_id). Validatsiya
+(OrderCreateItemInputSerializer), snapshot (OrderItem) va OrderItem.menu_item_name shu yerdan
+o'qiydi — barqaror holatda menyu jadvaliga murojaat yo'q.
+
+Hajmi MENU_ITEM_CACHE_SIZE bilan chegaralangan. MenuItem saqlansa/o'chirilsa (menu.signals)
+shu jarayonda kesh darhol tozalanadi. Boshqa worker'lardagi yoki signalsiz (queryset.update)
+o'zgarishlar uchun har bir yozuv MENU_ITEM_CACHE_TTL soniyadan keyin bazadan qayta o'qiladi —
+snapshot'ga tushadigan narx/is_available eskirishi shu muddat bilan chegaralangan.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+
+from .models import MenuItem
+
+MenuItemInfo = namedtuple("MenuItemInfo", "id name price is_available category_id")
+
+# id -> (MenuItemInfo, expires_at)
+_items = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_items(ids):
+    """{id: MenuItemInfo}; topilmagan id'lar natijada bo'lmaydi. Keshda yo'qlari bitta so'rovda."""
+    now = time.monotonic()
+    found, missing = {}, set()
+    with _lock:
+        for pk in ids:
+            entry = _items.get(pk)
+            if entry is None or entry[1] <= now:
+                missing.add(pk)
+            else:
+                _items.move_to_end(pk)
+                found[pk] = entry[0]
+    if missing:
+        rows = MenuItem.objects.filter(pk__in=missing).values_list(*MenuItemInfo._fields)
+        loaded = [MenuItemInfo(*row) for row in rows]
+        expires_at = now + settings.MENU_ITEM_CACHE_TTL
+        with _lock:
+            for pk in missing:
+                _items.pop(pk, None)
+            for info in loaded:
+                _items[info.id] = (info, expires_at)
+                found[info.id] = info
+            while len(_items) > settings.MENU_ITEM_CACHE_SIZE:
+                _items.popitem(last=False)
+    return found
+
+
+def get_item(pk):
+    return get_items((pk,)).get(pk)
+
+
+def invalidate():
+    with _lock:
+        _items.clear()
@@ -31,3 +31,16 @@ class MenuItemSerializer(serializers.ModelSerializer):
         if request:
             return request.build_absolute_uri(obj.image.url)
         return obj.image.url
+
+
+class CatalogItemSerializer(MenuItemSerializer):
+    class Meta(MenuItemSerializer.Meta):
+        fields = ["id", "name", "price", "description", "image_url", "prep_time_minutes"]
+
+
+class CatalogCategorySerializer(serializers.ModelSerializer):
+    items = CatalogItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Category
+        fields = ["id", "name", "sort_order", "items"]
@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from .models import Category, MenuItem
+
+
+class MenuCatalogTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+		self.cat = Category.objects.create(name="Drinks")
+		Category.objects.create(name="Old", is_active=False)
+		self.tea = MenuItem.objects.create(category=self.cat, name="Tea", price=Decimal("1.50"))
+		MenuItem.objects.create(category=self.cat, name="Juice", price=Decimal("3.00"), is_available=False)
+
+	def test_catalog_cached_with_etag(self):
+		r = self.client.get("/api/menu/catalog/")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(len(r.data), 1)
+		self.assertEqual([i["name"] for i in r.data[0]["items"]], ["Tea"])
+		etag = r["ETag"]
+
+		# faqat versiya (Category + MenuItem aggregate) — katalog keshdan
+		with self.assertNumQueries(2):
+			r = self.client.get("/api/menu/catalog/")
+		self.assertEqual(r.status_code, 200)
+
+		r = self.client.get("/api/menu/catalog/", HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(r.status_code, 304)
+
+	def test_menu_change_rebuilds_catalog(self):
+		etag = self.client.get("/api/menu/catalog/")["ETag"]
+		self.tea.price = Decimal("2.00")
+		self.tea.save()
+
+		r = self.client.get("/api/menu/catalog/", HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(r.status_code, 200)
+		self.assertNotEqual(r["ETag"], etag)
+		self.assertEqual(r.data[0]["items"][0]["price"], "2.00")
+
+	def test_version_follows_database_not_signals(self):
+		etag = self.client.get("/api/menu/catalog/")["ETag"]
+		# boshqa worker/yo'l: signal yo'q, lokal kesh tozalanmaydi
+		MenuItem.objects.filter(pk=self.tea.pk).update(price=Decimal("2.50"), updated_at=timezone.now())
+		r = self.client.get("/api/menu/catalog/", HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(r.data[0]["items"][0]["price"], "2.50")
+
+		etag = r["ETag"]
+		MenuItem.objects.filter(name="Juice").delete()
+		self.assertNotEqual(self.client.get("/api/menu/catalog/")["ETag"], etag)
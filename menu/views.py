@@ -1,7 +1,12 @@
+from django.utils.cache import parse_etags
+from rest_framework import status as http_status
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from accounts.permissions import ManagerOrReadOnly
+from . import catalog
 from .models import Category, MenuItem
 from .serializers import CategorySerializer, MenuItemSerializer
 from .filters import MenuItemFilter
@@ -23,3 +28,18 @@ class MenuItemViewSet(ModelViewSet):
     filterset_class = MenuItemFilter
     search_fields = ["name", "description"]
     ordering_fields = ["price", "name", "id", "prep_time_minutes"]
+
+
+class MenuCatalogView(APIView):
+    """
+    Faol kategoriyalar + mavjud elementlar, keshdan. ETag = katalog versiyasi;
+    If-None-Match mos kelsa 304 Not Modified qaytadi.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        version = catalog.get_version()
+        etag = f'"{version}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=http_status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(catalog.get_catalog(request, version), headers={"ETag": etag})
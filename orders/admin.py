@@ -4,7 +4,7 @@ from django.core.exceptions import ValidationError
 from django.utils.html import format_html
 
 from accounts.permissions import _role
-from .models import Order, OrderItem, OrderStatusLog
+from .models import Order, OrderItem, OrderStatusLog, bulk_change_status, recalculation_scope
 
 STATUS_TRANSITIONS = {
     Order.Status.NEW:      [Order.Status.COOKING, Order.Status.CANCELED],
@@ -348,28 +348,27 @@ class OrderAdmin(admin.ModelAdmin):
             except (ValidationError, Exception) as e:
                 self.message_user(request, f"❌ Status xatosi: {e}", messages.ERROR)
 
+    def save_related(self, request, form, formsets, change):
+        # Inline elementlar ko'p bo'lsa ham totals bir marta hisoblanadi
+        with recalculation_scope():
+            super().save_related(request, form, formsets, change)
+
     # ── Actions ──
     @admin.action(description="❌ BEKOR QILISH")
     def action_bekor(self, request, queryset):
-        role = _role(request.user)
-        for obj in queryset:
-            if obj.status in (Order.Status.PAID, Order.Status.CANCELED):
-                self.message_user(request, f"#{obj.id} allaqachon yopiq.", messages.WARNING)
-                continue
-            # WAITER faqat NEW statusidagi o'z buyurtmasini bekor qila oladi
-            if role == "WAITER":
-                if obj.created_by_id != request.user.id or obj.status != Order.Status.NEW:
-                    self.message_user(
-                        request,
-                        f"#{obj.id}: WAITER faqat o'zining NEW holatdagi buyurtmasini bekor qila oladi.",
-                        messages.ERROR,
-                    )
-                    continue
-            try:
-                obj.change_status(Order.Status.CANCELED, by_user=request.user, comment="Admin: bekor qilindi")
-                self.message_user(request, f"✅ #{obj.id} bekor qilindi.", messages.SUCCESS)
-            except Exception as e:
-                self.message_user(request, f"❌ #{obj.id}: {e}", messages.ERROR)
+        # API bilan bir xil engine: bitta tranzaksiya, qulf, bulk_update + bulk_create
+        results = bulk_change_status(
+            list(queryset.values_list("pk", flat=True)),
+            Order.Status.CANCELED,
+            by_user=request.user,
+            role=_role(request.user),
+            comment="Admin: bekor qilindi",
+        )
+        for result in results:
+            if result["ok"]:
+                self.message_user(request, f"✅ #{result['id']} bekor qilindi.", messages.SUCCESS)
+            else:
+                self.message_user(request, f"❌ #{result['id']}: {result['detail']}", messages.ERROR)
 
 
 # ─────────────────────────────────────────────
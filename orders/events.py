@@ -0,0 +1,110 @@
+"""
+Buyurtma hodisalari (status o'zgarishi, yangi element) uchun pub/sub.
+
+Standart broker — InProcessBroker: bitta jarayon ichida, asyncio navbatlari orqali.
+Bir nechta worker/jarayon bo'lsa settings.ORDER_EVENTS_BROKER ni boshqa klassga
+(masalan Redis pub/sub) almashtiring: u `publish(event)`, `subscribe()` va
+`unsubscribe(subscription)` ni amalga oshirishi kifoya.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class InProcessBroker:
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # asyncio.Queue -> event loop
+
+    def subscribe(self):
+        """Joriy event loop uchun navbat qaytaradi (async kontekstda chaqiriladi)."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.pop(subscription, None)
+
+    def publish(self, event):
+        """Istalgan thread'dan chaqirish mumkin."""
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # loop yopilgan — obunachi uzilgan
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _offer(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # sekin client: eski hodisani tashlab, yangisini qo'yamiz
+            queue.get_nowait()
+            queue.put_nowait(event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.ORDER_EVENTS_BROKER)()
+    return _broker
+
+
+def publish_on_commit(event):
+    """Tranzaksiya commit bo'lgandan keyin e'lon qiladi (rollback bo'lsa — hech narsa)."""
+    event.setdefault("at", timezone.now().isoformat())
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def status_changed(order, from_status, to_status, by_user):
+    publish_on_commit({
+        "type": "status_changed",
+        "order_id": order.pk,
+        "order_code": order.order_code,
+        "table_id": order.table_id,
+        "created_by_id": order.created_by_id,
+        "from_status": from_status,
+        "to_status": to_status,
+        "changed_by_id": by_user.pk if by_user else None,
+    })
+
+
+def items_added(order, items):
+    publish_on_commit({
+        "type": "items_added",
+        "order_id": order.pk,
+        "order_code": order.order_code,
+        "table_id": order.table_id,
+        "created_by_id": order.created_by_id,
+        "status": order.status,
+        "items": [
+            {"id": item.pk, "item_name_snapshot": item.item_name_snapshot, "qty": item.qty, "notes": item.notes}
+            for item in items
+        ],
+    })
+
+
+def visible_to(event, role, user_id):
+    """Rol bo'yicha ko'rinish: MANAGER/CHEF — hammasi, WAITER — faqat o'z buyurtmalari."""
+    if role in ("MANAGER", "CHEF"):
+        return True
+    if role == "WAITER":
+        return event.get("created_by_id") == user_id
+    return False
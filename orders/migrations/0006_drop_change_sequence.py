@@ -0,0 +1,16 @@
+# Generated by Django 4.2.28 on 2026-10-18 15:42
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_order_version'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ChangeSequence',
+        ),
+    ]
@@ -1,13 +1,61 @@
+from collections import Counter
+from contextlib import contextmanager
 from django.conf import settings
-from django.core.exceptions import ValidationError
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models, transaction
-from django.db.models import Sum
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 from decimal import Decimal
+import threading
+import time
 import uuid
 
 from tables.models import Table
+from menu import lookup as menu_lookup
 from menu.models import MenuItem
+from . import events
+from .signals import order_items_bulk_created, order_status_bulk_changed
+
+
+# ─────────────────────────────────────────────────────────────
+#  Totals qayta hisoblashni kechiktirish (recalc scope)
+# ─────────────────────────────────────────────────────────────
+_recalc_state = threading.local()
+
+
+@contextmanager
+def recalculation_scope():
+    """
+    Blok ichida o'zgargan buyurtmalar totalini commit oldidan BIR marta hisoblaydi.
+
+    OrderItem/Payment save/delete har safar recalculate_totals() chaqirmaydi —
+    order id "dirty" to'plamga yoziladi. Ichma-ich scope'lar tashqi scope'ga qo'shiladi.
+    """
+    if getattr(_recalc_state, "pending", None) is not None:
+        yield
+        return
+
+    _recalc_state.pending = {}
+    try:
+        with transaction.atomic():
+            yield
+            while _recalc_state.pending:
+                pending, _recalc_state.pending = _recalc_state.pending, {}
+                for order in pending.values():
+                    order.recalculate_totals()
+    finally:
+        _recalc_state.pending = None
+
+
+def change_stamp():
+    """
+    Kitchen ?since= cursor uchun o'zgarish belgisi: epoch mikrosekundlari.
+    Umumiy hisoblagich qatori yo'q — order yozuvlari bir-birini kutmaydi. Belgi commit'dan
+    oldin olinadi, shuning uchun commit tartibiga mos emas: o'quvchilar cursor'dan
+    KITCHEN_CURSOR_LAG soniya pastini qayta ko'radi (orders.views.OrderViewSet.kitchen).
+    """
+    return time.time_ns() // 1000
 
 
 class Order(models.Model):
@@ -53,6 +101,11 @@ class Order(models.Model):
 
     is_closed = models.BooleanField(default=False)
 
+    # har bir o'zgarishda (status, elementlar, totals) yangi change_stamp()
+    change_seq = models.BigIntegerField(default=0, db_index=True, editable=False)
+    # optimistic concurrency: har bir save() da +1, API da ETag / If-Match
+    version = models.PositiveIntegerField(default=1, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -60,6 +113,12 @@ class Order(models.Model):
         ordering            = ["-created_at"]
         verbose_name        = "Buyurtma"
         verbose_name_plural = "Buyurtmalar"
+        indexes = [
+            models.Index(fields=["created_at"], name="order_created_idx"),
+            models.Index(fields=["status", "created_at"], name="order_status_created_idx"),
+            models.Index(fields=["created_by", "created_at"], name="order_creator_created_idx"),
+            models.Index(fields=["table", "status"], name="order_table_status_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Buyurtma #{self.id} ({self.get_status_display()})"
@@ -85,38 +144,119 @@ class Order(models.Model):
         if not self.order_code:
             self.order_code = uuid.uuid4().hex[:12].upper()
 
-        old_status = None
-        old_table_id = None
+        self.change_seq = change_stamp()
         if self.pk:
-            old = Order.objects.filter(pk=self.pk).values("status", "table_id").first()
-            if old:
-                old_status = old["status"]
-                old_table_id = old["table_id"]
+            self.version += 1
+        # is_closed statusdan kelib chiqadi — status bilan bitta UPDATE'da yoziladi
+        self.is_closed = self._is_closed_status(self.status)
+        if kwargs.get("update_fields") is not None:
+            extra = {"change_seq", "version"}
+            if "status" in kwargs["update_fields"]:
+                extra.add("is_closed")
+            kwargs["update_fields"] = {*kwargs["update_fields"], *extra}
+
+        update_fields = kwargs.get("update_fields")
+        adding = self._state.adding
+        tracked = update_fields is None or bool({"status", "table", "table_id"} & set(update_fields))
+        if tracked and not adding:
+            old_status = self.loaded_value("status")
+            old_table_id = self.loaded_value("table_id")
+        discount_tracked = not adding and (
+            update_fields is None or bool({"discount_type", "discount_value"} & set(update_fields))
+        )
+        if discount_tracked:
+            old_discount = (self.loaded_value("discount_type"), self.loaded_value("discount_value"))
 
         super().save(*args, **kwargs)
 
-        # sync table occupancy (simple + deterministic)
-        self._sync_table_status(old_status=old_status, old_table_id=old_table_id)
-
-    def _sync_table_status(self, old_status=None, old_table_id=None):
-        # if table changed, free old one
-        if old_table_id and old_table_id != self.table_id:
-            Table.objects.filter(id=old_table_id).update(status=Table.Status.FREE)
-
-        # update current table based on order state
-        if not self.table_id:
-            return
-
-        if self.status in (self.Status.PAID, self.Status.CANCELED):
-            Table.objects.filter(id=self.table_id).update(status=Table.Status.FREE)
-        else:
-            Table.objects.filter(id=self.table_id).update(status=Table.Status.OCCUPIED)
+        # totals faqat chegirma o'zgarganda qayta hisoblanadi (elementlar/to'lovlar o'zi chaqiradi)
+        if discount_tracked and old_discount != (self.discount_type, self.discount_value):
+            self.schedule_recalculation()
+
+        # stol hisoblagichi — faqat stol yoki ochiq/yopiq holat o'zgarganda
+        if adding:
+            self._sync_table_status()
+        elif tracked and (
+            old_table_id != self.table_id
+            or self._is_closed_status(old_status) != self._is_closed_status(self.status)
+        ):
+            self._sync_table_status(old_table_id=old_table_id, old_status=old_status)
+        self._remember_loaded(update_fields)
+
+    # ── Yuklangan qiymatlar (table sync, rollup va chegirma uchun qo'shimcha SELECT'siz) ──
+    TRACKED_FIELDS = ("status", "table_id", "discount_type", "discount_value")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._remember_loaded(fields)
+
+    def _remember_loaded(self, fields=None):
+        """Bazadagi holat deb hisoblanadigan qiymatlarni eslab qoladi (fields=None — hammasi)."""
+        loaded = getattr(self, "_loaded_values", {})
+        for name in self.TRACKED_FIELDS:
+            if fields is not None and name not in fields and name.removesuffix("_id") not in fields:
+                continue
+            if name in self.__dict__:  # deferred maydonlar eslanmaydi
+                loaded[name] = self.__dict__[name]
+        self._loaded_values = loaded
+
+    def loaded_value(self, name):
+        """
+        Maydonning bazadan o'qilgan (yoki oxirgi save'dagi) qiymati.
+        Instance bazadan yuklanmagan bo'lsa (masalan Order(pk=...)) — bir marta bazadan olinadi.
+        """
+        loaded = getattr(self, "_loaded_values", {})
+        if name not in loaded and self.pk:
+            row = Order.objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).first() or {}
+            for field, value in row.items():
+                loaded.setdefault(field, value)
+            self._loaded_values = loaded
+        return loaded.get(name)
+
+    @classmethod
+    def _is_closed_status(cls, status):
+        return status in (cls.Status.PAID, cls.Status.CANCELED)
+
+    def _sync_table_status(self, old_table_id=None, old_status=None):
+        """Eski stoldan ochiq buyurtmani ayiradi, yangisiga qo'shadi (Table.active_order_count)."""
+        was_active = bool(old_table_id) and old_status is not None and not self._is_closed_status(old_status)
+        is_active = bool(self.table_id) and not self._is_closed_status(self.status)
+        if was_active and (not is_active or old_table_id != self.table_id):
+            Table.release(old_table_id)
+        if is_active and (not was_active or old_table_id != self.table_id):
+            Table.occupy(self.table_id)
 
     def delete(self, *args, **kwargs):
-        """Free the table before deleting the order."""
-        if self.table_id:
-            Table.objects.filter(id=self.table_id).update(status=Table.Status.FREE)
-        super().delete(*args, **kwargs)
+        """Ochiq buyurtma o'chirilsa, stol hisoblagichidan ayiriladi."""
+        table_id = self.loaded_value("table_id")
+        if table_id and not self._is_closed_status(self.loaded_value("status")):
+            Table.release(table_id)
+        return super().delete(*args, **kwargs)
+
+    def lock(self):
+        """
+        SELECT ... FOR UPDATE — qatorni tranzaksiya oxirigacha qulflaydi va instance'ni
+        bazadagi joriy holatga keltiradi. Faqat transaction.atomic ichida chaqiriladi.
+        """
+        fresh = Order.objects.select_for_update().get(pk=self.pk)
+        for field in self._meta.concrete_fields:
+            setattr(self, field.attname, getattr(fresh, field.attname))
+        self._loaded_values = dict(fresh._loaded_values)
+        return self
+
+    def schedule_recalculation(self):
+        """recalculation_scope() ichida bo'lsa kechiktiradi, aks holda darhol hisoblaydi."""
+        pending = getattr(_recalc_state, "pending", None)
+        if pending is None:
+            self.recalculate_totals()
+        elif self.pk:
+            pending[self.pk] = self
 
     def recalculate_totals(self):
         """
@@ -154,6 +294,7 @@ class Order(models.Model):
             due_amount = Decimal("0.00")
 
         is_closed = self.status in (self.Status.PAID, self.Status.CANCELED)
+        change_seq = change_stamp()
 
         Order.objects.filter(pk=self.pk).update(
             subtotal=subtotal,
@@ -162,6 +303,7 @@ class Order(models.Model):
             paid_total=paid_total,
             due_amount=due_amount,
             is_closed=is_closed,
+            change_seq=change_seq,
         )
 
         # keep instance in sync (optional but useful)
@@ -171,26 +313,28 @@ class Order(models.Model):
         self.paid_total = paid_total
         self.due_amount = due_amount
         self.is_closed = is_closed
+        self.change_seq = change_seq
 
     @transaction.atomic
-    def change_status(self, to_status: str, by_user, comment: str = ""):
+    def change_status(self, to_status: str, by_user, comment: str = "", role: str = None):
         """
         Status transition + log (API shu methodni ishlatadi).
+        Qator qulflanadi: parallel o'tishlar ikki marta log yozmaydi.
+        role berilsa STATUS_TRANSITION_ROLES va WAITER egaligi qulflangan qator bo'yicha
+        tekshiriladi (PermissionDenied) — oradagi parallel o'zgarish ruxsatni chetlab o'tmaydi.
         """
+        self.lock()
         from_status = self.status
         if from_status == to_status:
             return
 
-        # Minimal transition rules (qattiq)
-        allowed = {
-            self.Status.NEW: {self.Status.COOKING, self.Status.CANCELED},
-            self.Status.COOKING: {self.Status.READY, self.Status.CANCELED},
-            self.Status.READY: {self.Status.SERVED, self.Status.CANCELED},
-            self.Status.SERVED: {self.Status.PAID, self.Status.CANCELED},
-            self.Status.PAID: set(),
-            self.Status.CANCELED: set(),
-        }
-        if to_status not in allowed.get(from_status, set()):
+        if role is not None:
+            if role not in STATUS_TRANSITION_ROLES.get((from_status, to_status), set()):
+                raise PermissionDenied(f"Ruxsat yo'q: {role} — {from_status} → {to_status}")
+            if role == "WAITER" and self.created_by_id != by_user.id:
+                raise PermissionDenied("Bu buyurtma sizga tegishli emas.")
+
+        if to_status not in ALLOWED_TRANSITIONS.get(from_status, set()):
             raise ValidationError(f"Status transition mumkin emas: {from_status} -> {to_status}")
 
         self.status = to_status
@@ -203,9 +347,56 @@ class Order(models.Model):
             changed_by=by_user,
             comment=comment or "",
         )
-
-        # paid/canceled bo'lsa stolni bo'shatadi (save ichida sync bor)
-        self.recalculate_totals()
+        events.status_changed(self, from_status, to_status, by_user)
+        # totals qayta hisoblanmaydi: status pulga ta'sir qilmaydi, is_closed save() da yozildi
+
+
+# Minimal transition rules (qattiq)
+ALLOWED_TRANSITIONS = {
+    Order.Status.NEW: {Order.Status.COOKING, Order.Status.CANCELED},
+    Order.Status.COOKING: {Order.Status.READY, Order.Status.CANCELED},
+    Order.Status.READY: {Order.Status.SERVED, Order.Status.CANCELED},
+    Order.Status.SERVED: {Order.Status.PAID, Order.Status.CANCELED},
+    Order.Status.PAID: set(),
+    Order.Status.CANCELED: set(),
+}
+
+# ─────────────────────────────────────────────────────────────
+#  Rol asosida qaysi statusga kim o'ta olishi — MARKAZIY QOIDA
+# ─────────────────────────────────────────────────────────────
+#  MUHIM: SERVED → PAID yo'q! PAID faqat to'lov orqali avtomatik.
+STATUS_TRANSITION_ROLES = {
+    # (from_status, to_status): {rollar seti}
+    (Order.Status.NEW,     Order.Status.COOKING):  {"MANAGER", "CHEF"},
+    (Order.Status.COOKING, Order.Status.READY):    {"MANAGER", "CHEF"},
+    (Order.Status.READY,   Order.Status.SERVED):   {"MANAGER", "WAITER"},
+    # CANCELED — kimlar qila oladi:
+    (Order.Status.NEW,     Order.Status.CANCELED): {"MANAGER", "WAITER"},
+    (Order.Status.COOKING, Order.Status.CANCELED): {"MANAGER"},
+    (Order.Status.READY,   Order.Status.CANCELED): {"MANAGER"},
+    (Order.Status.SERVED,  Order.Status.CANCELED): {"MANAGER"},
+}
+
+
+def order_stats(qs):
+    """
+    Buyurtmalar soni, status bo'yicha taqsimot va PAID tushumi — bitta so'rovda
+    (shartli agregatsiya: Count/Sum(..., filter=Q(...))).
+    """
+    agg = qs.order_by().aggregate(
+        total_orders=Count("id"),
+        total_revenue_paid=Sum("total", filter=Q(status=Order.Status.PAID)),
+        **{status: Count("id", filter=Q(status=status)) for status in Order.Status.values},
+    )
+    return {
+        "total_orders": agg["total_orders"],
+        "by_status": [
+            {"status": status, "count": agg[status]}
+            for status in Order.Status.values
+            if agg[status]
+        ],
+        "total_revenue_paid": agg["total_revenue_paid"] or 0,
+    }
 
 
 class OrderItem(models.Model):
@@ -227,26 +418,81 @@ class OrderItem(models.Model):
         ordering            = ["id"]
         verbose_name        = "Buyurtma elementi"
         verbose_name_plural = "Buyurtma elementlari"
+        indexes = [
+            models.Index(fields=["created_at"], name="orderitem_created_idx"),
+        ]
 
     def __str__(self) -> str:
-        return f"{self.qty} × {self.item_name_snapshot or self.menu_item.name}"
+        return f"{self.qty} × {self.item_name_snapshot or self.menu_item_name}"
 
-    def save(self, *args, **kwargs):
-        if not self.item_name_snapshot:
-            self.item_name_snapshot = self.menu_item.name
-        if self.unit_price_snapshot == Decimal("0.00"):
-            self.unit_price_snapshot = self.menu_item.price
+    @property
+    def menu_item_name(self):
+        """Joriy menyu nomi: select_related bo'lsa o'shandan, aks holda menu.lookup keshidan."""
+        if OrderItem.menu_item.is_cached(self):
+            return self.menu_item.name
+        info = menu_lookup.get_item(self.menu_item_id)
+        return info.name if info else ""
+
+    def _fill_snapshot(self, menu_item=None):
+        """
+        Snapshot + line_total; menu_item (MenuItem yoki MenuItemInfo) berilmasa kerak
+        bo'lgandagina olinadi — yuklangan bo'lsa self.menu_item, aks holda menu.lookup keshi.
+        """
+        if not self.item_name_snapshot or self.unit_price_snapshot == Decimal("0.00"):
+            if menu_item is None:
+                if OrderItem.menu_item.is_cached(self):
+                    menu_item = self.menu_item
+                else:
+                    menu_item = menu_lookup.get_item(self.menu_item_id)
+                    if menu_item is None:
+                        raise ValidationError(f"MenuItem id={self.menu_item_id} topilmadi.")
+            if not self.item_name_snapshot:
+                self.item_name_snapshot = menu_item.name
+            if self.unit_price_snapshot == Decimal("0.00"):
+                self.unit_price_snapshot = menu_item.price
 
         self.line_total = (Decimal(self.qty) * self.unit_price_snapshot).quantize(Decimal("0.01"))
+
+    def save(self, *args, **kwargs):
+        self._fill_snapshot()
         super().save(*args, **kwargs)
 
         # after item update, recompute order totals
-        self.order.recalculate_totals()
+        self.order.schedule_recalculation()
 
     def delete(self, *args, **kwargs):
         order = self.order
         super().delete(*args, **kwargs)
-        order.recalculate_totals()
+        order.schedule_recalculation()
+
+    @classmethod
+    def bulk_add(cls, order, items_data):
+        """
+        Bir nechta elementni bitta INSERT bilan qo'shadi.
+
+        items_data: [{"menu_item_id", "qty", "notes"?}, ...]. MenuItem ma'lumotlari
+        menu.lookup keshidan (yo'qlari bitta so'rovda) olinadi, snapshot/line_total xotirada
+        hisoblanadi, totals bir marta (yoki recalculation_scope oxirida) yangilanadi.
+        """
+        if not items_data:
+            return []
+
+        menu_items = menu_lookup.get_items({it["menu_item_id"] for it in items_data})
+        items = []
+        for it in items_data:
+            menu_item = menu_items.get(it["menu_item_id"])
+            if menu_item is None:
+                raise ValidationError(f"MenuItem id={it['menu_item_id']} topilmadi.")
+            if not menu_item.is_available:
+                raise ValidationError(f"MenuItem id={it['menu_item_id']} hozir mavjud emas.")
+            item = cls(order=order, menu_item_id=menu_item.id, qty=it["qty"], notes=it.get("notes", ""))
+            item._fill_snapshot(menu_item)
+            items.append(item)
+
+        items = cls.objects.bulk_create(items)
+        order_items_bulk_created.send(sender=cls, items=items)
+        order.schedule_recalculation()
+        return items
 
 
 class OrderStatusLog(models.Model):
@@ -265,3 +511,79 @@ class OrderStatusLog(models.Model):
 
     def __str__(self) -> str:
         return f"Buyurtma #{self.order_id}: {self.from_status} → {self.to_status}"
+
+
+def bulk_change_status(order_ids, to_status, by_user, role, comment=""):
+    """
+    Ko'p buyurtmani bitta tranzaksiyada bir statusga o'tkazadi (API va admin uchun).
+
+    Qatorlar bitta SELECT ... FOR UPDATE bilan qulflanadi, har biri STATUS_TRANSITION_ROLES
+    va ALLOWED_TRANSITIONS bo'yicha tekshiriladi; o'tganlari bulk_update, loglar bulk_create.
+    Totals o'zgarmaydi (faqat is_closed) — recalc yo'q. Natija: kiritilgan tartibda
+    [{"id", "ok", "from_status", "to_status"} | {"id", "ok": False, "detail"}].
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    results = []
+    changed = []
+
+    with transaction.atomic():
+        orders = {o.pk: o for o in Order.objects.select_for_update().filter(pk__in=order_ids)}
+
+        for order_id in order_ids:
+            order = orders.get(order_id)
+            if order is None:
+                results.append({"id": order_id, "ok": False, "detail": "Buyurtma topilmadi."})
+                continue
+            from_status = order.status
+            if from_status == to_status or Order._is_closed_status(from_status):
+                detail = f"Buyurtma allaqachon {from_status} holatida."
+            elif role not in STATUS_TRANSITION_ROLES.get((from_status, to_status), set()):
+                detail = f"Ruxsat yo'q: {role} — {from_status} → {to_status}"
+            elif role == "WAITER" and order.created_by_id != by_user.id:
+                detail = "Bu buyurtma sizga tegishli emas."
+            elif to_status not in ALLOWED_TRANSITIONS.get(from_status, set()):
+                detail = f"Status transition mumkin emas: {from_status} -> {to_status}"
+            else:
+                detail = None
+            if detail:
+                results.append({"id": order_id, "ok": False, "detail": detail})
+                continue
+            changed.append((order, from_status))
+            results.append({"id": order_id, "ok": True, "from_status": from_status, "to_status": to_status})
+
+        if not changed:
+            return results
+
+        now = timezone.now()
+        change_seq = change_stamp()
+        is_closed = Order._is_closed_status(to_status)
+        for order, _ in changed:
+            order.status = to_status
+            order.is_closed = is_closed
+            order.updated_at = now
+            order.change_seq = change_seq
+            order.version += 1
+        Order.objects.bulk_update(
+            [order for order, _ in changed],
+            ["status", "is_closed", "updated_at", "change_seq", "version"],
+        )
+        OrderStatusLog.objects.bulk_create([
+            OrderStatusLog(order=order, from_status=from_status, to_status=to_status, changed_by=by_user, comment=comment or "")
+            for order, from_status in changed
+        ])
+
+        # stol hisoblagichi: yopilgan ochiq buyurtmalar stol bo'yicha guruhlanadi
+        if is_closed:
+            released = Counter(
+                order.table_id for order, from_status in changed
+                if order.table_id and not Order._is_closed_status(from_status)
+            )
+            for table_id, count in released.items():
+                Table.release(table_id, count)
+
+        for order, from_status in changed:
+            order._remember_loaded()
+            events.status_changed(order, from_status, to_status, by_user)
+        order_status_bulk_changed.send(sender=Order, changes=changed)
+
+    return results
@@ -1,11 +1,11 @@
 from rest_framework import serializers
-from django.db import transaction
-from menu.models import MenuItem
-from .models import Order, OrderItem, OrderStatusLog
+from menu import lookup as menu_lookup
+from . import events
+from .models import Order, OrderItem, OrderStatusLog, recalculation_scope
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
-    menu_item_name = serializers.CharField(source="menu_item.name", read_only=True)
+    menu_item_name = serializers.CharField(read_only=True)
 
     class Meta:
         model = OrderItem
@@ -26,14 +26,73 @@ class OrderStatusLogSerializer(serializers.ModelSerializer):
         read_only_fields = ["changed_at"]
 
 
+class OrderListSerializer(serializers.ModelSerializer):
+    """
+    Ro'yxat uchun ixcham ko'rinish (planshetlar tez-tez so'raydi).
+    Nested maydonlar faqat context["expand"] da bo'lsa qo'shiladi: ?expand=items,status_logs
+    """
+    created_by_username = serializers.CharField(source="created_by.username", read_only=True)
+
+    EXPANDABLE = ("items", "status_logs")
+
+    class Meta:
+        model = Order
+        fields = [
+            "id", "order_code",
+            "order_type", "table", "customer_name",
+            "created_by", "created_by_username",
+            "status",
+            "total", "paid_total", "due_amount",
+            "is_closed", "version",
+            "created_at", "updated_at",
+        ]
+        read_only_fields = fields
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get("expand", ())
+        if "items" in expand:
+            fields["items"] = OrderItemSerializer(many=True, read_only=True)
+        if "status_logs" in expand:
+            fields["status_logs"] = OrderStatusLogSerializer(many=True, read_only=True)
+        return fields
+
+
+class KitchenItemSerializer(serializers.ModelSerializer):
+    prep_time_minutes = serializers.IntegerField(source="menu_item.prep_time_minutes", read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ["id", "item_name_snapshot", "qty", "notes", "prep_time_minutes"]
+        read_only_fields = fields
+
+
+class KitchenOrderSerializer(serializers.ModelSerializer):
+    """Oshxona navbati: faqat tayyorlash uchun kerakli maydonlar."""
+    items = KitchenItemSerializer(many=True, read_only=True)
+    max_prep_minutes = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            "id", "order_code", "order_type", "table", "customer_name",
+            "status", "notes", "created_at", "change_seq",
+            "max_prep_minutes", "items",
+        ]
+        read_only_fields = fields
+
+
 class OrderCreateItemInputSerializer(serializers.Serializer):
     menu_item_id = serializers.IntegerField()
     qty = serializers.IntegerField(min_value=1)
     notes = serializers.CharField(required=False, allow_blank=True)
 
     def validate_menu_item_id(self, value):
-        if not MenuItem.objects.filter(pk=value).exists():
+        info = menu_lookup.get_item(value)
+        if info is None:
             raise serializers.ValidationError(f"MenuItem id={value} topilmadi.")
+        if not info.is_available:
+            raise serializers.ValidationError(f"MenuItem id={value} hozir mavjud emas.")
         return value
 
 
@@ -54,7 +113,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "status", "notes",
             "discount_type", "discount_value",
             "subtotal", "discount_amount", "total", "paid_total", "due_amount",
-            "is_closed",
+            "is_closed", "version",
             "created_at", "updated_at",
             "items", "status_logs",
             "create_items",
@@ -63,7 +122,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "order_code",
             "created_by",
             "subtotal", "discount_amount", "total", "paid_total", "due_amount",
-            "is_closed",
+            "is_closed", "version",
             "created_at", "updated_at",
         ]
 
@@ -79,16 +138,13 @@ class OrderSerializer(serializers.ModelSerializer):
 
         return attrs
 
-    @transaction.atomic
     def create(self, validated_data):
         items_data = validated_data.pop("create_items", [])
-        order = Order.objects.create(**validated_data)
-        for it in items_data:
-            OrderItem.objects.create(
-                order=order,
-                menu_item_id=it["menu_item_id"],
-                qty=it["qty"],
-                notes=it.get("notes", ""),
-            )
-        order.recalculate_totals()
+        # recalculation_scope o'zi transaction.atomic; totals oxirida bir marta hisoblanadi
+        with recalculation_scope():
+            order = Order.objects.create(**validated_data)
+            items = OrderItem.bulk_add(order, items_data)
+            order.schedule_recalculation()
+            if items:
+                events.items_added(order, items)
         return order
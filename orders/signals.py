@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# OrderItem.bulk_add() bulk_create ishlatadi — post_save yuborilmaydi.
+# Qabul qiluvchilar `items` (saqlangan OrderItem ro'yxati) oladi.
+order_items_bulk_created = Signal()
+
+# bulk_change_status() bulk_update ishlatadi — pre_save/post_save yuborilmaydi.
+# Qabul qiluvchilar `changes` ([(order, from_status), ...], order.status — yangi holat) oladi.
+order_status_bulk_changed = Signal()
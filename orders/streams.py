@@ -0,0 +1,119 @@
+"""
+Server-Sent Events: buyurtma hodisalari oqimi (GET /api/orders/events/).
+
+Faqat ASGI ostida ishlaydi (config.asgi, masalan `uvicorn config.asgi:application`):
+har bir planshet bitta ulanish ushlab turadi va InProcessBroker navbatlari shu jarayonning
+event loop'iga bog'langan. WSGI ostida (PythonAnywhere, config.wsgi) cheksiz oqim worker
+thread'ini butunlay band qiladi, hodisalar esa boshqa so'rovlardan yetib kelmaydi — shuning
+uchun view 503 qaytaradi; u yerda oshxona navbatining `?since=` so'rovidan foydalaning.
+
+EventSource header yubora olmaydi, access JWT'ni URL'ga qo'yish esa uni access/proxy
+loglariga yozadi. O'rniga POST /api/orders/events/ticket/ (oddiy JWT bilan) qisqa muddatli,
+faqat shu oqim uchun imzolangan ticket beradi: GET /api/orders/events/?ticket=...
+Header'li (Authorization: Bearer) clientlar ticket'siz ham ulanadi.
+
+Django 4.2 ASGI handler'i oqim paytida `http.disconnect` ni kuzatmaydi: uzilgan client'ga
+yozish jim yutilsa, obuna va heartbeat tsikli abadiy qoladi. Shuning uchun oqim
+ORDER_EVENTS_MAX_LIFETIME soniyadan keyin o'zi yopiladi; EventSource `retry:` bo'yicha qayta ulanadi.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from accounts.models import User
+from accounts.permissions import _role
+from . import events
+
+TICKET_SALT = "orders.events.ticket"
+
+
+def issue_ticket(user):
+    return signing.TimestampSigner(salt=TICKET_SALT).sign(str(user.pk))
+
+
+def _user_from_ticket(ticket):
+    try:
+        user_id = signing.TimestampSigner(salt=TICKET_SALT).unsign(
+            ticket, max_age=settings.ORDER_EVENTS_TICKET_TTL,
+        )
+    except signing.BadSignature:  # SignatureExpired ham shu
+        return None
+    return User.objects.filter(pk=user_id).first()
+
+
+def _authenticate(request):
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return _user_from_ticket(ticket)
+    auth = JWTAuthentication()
+    try:
+        result = auth.authenticate(request)
+    except (InvalidToken, TokenError):
+        return None
+    return result[0] if result else None
+
+
+def _format(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+class OrderEventsTicketView(APIView):
+    """SSE oqimi uchun qisqa muddatli ticket (URL'da JWT o'rniga)."""
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=None, responses={200: OpenApiTypes.OBJECT})
+    def post(self, request):
+        return Response({"ticket": issue_ticket(request.user), "expires_in": settings.ORDER_EVENTS_TICKET_TTL})
+
+
+async def order_events(request):
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Hodisalar oqimi faqat ASGI serverda ishlaydi; /api/orders/kitchen/?since= dan foydalaning."},
+            status=503,
+        )
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({"detail": "Autentifikatsiya talab qilinadi."}, status=401)
+
+    role = _role(user)
+    if not role:
+        return JsonResponse({"detail": "Ruxsat yo'q."}, status=403)
+
+    broker = events.get_broker()
+    subscription = broker.subscribe()
+    heartbeat = settings.ORDER_EVENTS_HEARTBEAT
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ORDER_EVENTS_MAX_LIFETIME
+        try:
+            yield "retry: 3000\n\n"
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=min(heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if events.visible_to(event, role, user.pk):
+                    yield _format(event)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
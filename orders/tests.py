@@ -1,10 +1,21 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib import admin
+from django.db import OperationalError, close_old_connections, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
 
 from accounts.models import User
 from tables.models import Table
 from menu.models import Category, MenuItem
-from .models import Order, OrderItem, OrderStatusLog
+from . import events, streams
+from .models import Order, OrderItem, OrderStatusLog, recalculation_scope
 from payments.models import Payment
 from decimal import Decimal
 
@@ -56,3 +67,522 @@ class OrderModelTests(TestCase):
 		order.refresh_from_db()
 		self.assertEqual(order.paid_total, order.total)
 		self.assertEqual(order.due_amount, 0)
+
+	def test_save_skips_table_sync_when_status_and_table_unchanged(self):
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		order = Order.objects.get(pk=order.pk)
+		order.notes = "achchiq emas"
+		with CaptureQueriesContext(connection) as ctx:
+			order.save()
+
+		sql = [q["sql"] for q in ctx.captured_queries]
+		self.assertFalse([q for q in sql if q.startswith('SELECT "orders_order"')])
+		self.assertFalse([q for q in sql if "tables_table" in q])
+
+	def test_table_freed_and_moved_via_loaded_values(self):
+		other = Table.objects.create(number=2)
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		self.table.refresh_from_db()
+		self.assertEqual(self.table.status, Table.Status.OCCUPIED)
+
+		order = Order.objects.get(pk=order.pk)
+		order.table = other
+		order.save()
+		self.table.refresh_from_db()
+		other.refresh_from_db()
+		self.assertEqual(self.table.status, Table.Status.FREE)
+		self.assertEqual(other.status, Table.Status.OCCUPIED)
+
+		with CaptureQueriesContext(connection) as ctx:
+			order.change_status(Order.Status.CANCELED, by_user=self.user)
+		self.assertEqual(len([q for q in ctx.captured_queries if q["sql"].startswith('SELECT "orders_order"')]), 1)  # lock()
+		other.refresh_from_db()
+		self.assertEqual(other.status, Table.Status.FREE)
+
+	def test_table_stays_occupied_while_other_orders_open(self):
+		first = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		second = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		self.table.refresh_from_db()
+		self.assertEqual(self.table.active_order_count, 2)
+
+		first.change_status(Order.Status.CANCELED, by_user=self.user)
+		self.table.refresh_from_db()
+		self.assertEqual(self.table.active_order_count, 1)
+		self.assertEqual(self.table.status, Table.Status.OCCUPIED)
+
+		second.delete()
+		self.table.refresh_from_db()
+		self.assertEqual(self.table.active_order_count, 0)
+		self.assertEqual(self.table.status, Table.Status.FREE)
+
+	def test_change_status_skips_totals_recalculation(self):
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		OrderItem.objects.create(order=order, menu_item=self.item1, qty=2)
+		with CaptureQueriesContext(connection) as ctx:
+			order.change_status(Order.Status.COOKING, by_user=self.user)
+		self.assertFalse([q for q in ctx.captured_queries if "SUM(" in q["sql"]])
+		order_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "orders_order"')]
+		self.assertEqual(len(order_updates), 1)
+
+		order.change_status(Order.Status.CANCELED, by_user=self.user)
+		order.refresh_from_db()
+		self.assertTrue(order.is_closed)
+		self.assertEqual(order.total, Decimal("3.00"))
+
+	def test_discount_change_recalculates_totals(self):
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		OrderItem.objects.create(order=order, menu_item=self.item2, qty=5)
+		order = Order.objects.get(pk=order.pk)
+		order.discount_type = Order.DiscountType.PERCENT
+		order.discount_value = Decimal("10")
+		order.save()
+		order.refresh_from_db()
+		self.assertEqual(order.discount_amount, Decimal("1.00"))
+		self.assertEqual(order.total, Decimal("9.00"))
+
+		with CaptureQueriesContext(connection) as ctx:
+			order.notes = "deraza yonida"
+			order.save()
+		self.assertFalse([q for q in ctx.captured_queries if "SUM(" in q["sql"]])
+
+	def test_recalculation_scope_recomputes_once(self):
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		with CaptureQueriesContext(connection) as ctx:
+			with recalculation_scope():
+				for _ in range(5):
+					OrderItem.objects.create(order=order, menu_item=self.item1, qty=1)
+				Payment.objects.create(order=order, received_by=self.user, method=Payment.Method.CASH, amount=Decimal("2.00"))
+
+		total_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "orders_order"')]
+		self.assertEqual(len(total_updates), 1)
+		self.assertEqual(order.subtotal, Decimal("7.50"))
+		self.assertEqual(order.due_amount, Decimal("5.50"))
+		order.refresh_from_db()
+		self.assertEqual(order.total, Decimal("7.50"))
+		self.assertEqual(order.paid_total, Decimal("2.00"))
+
+	def test_bulk_add_items_single_insert(self):
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		data = [{"menu_item_id": self.item1.id, "qty": 2}, {"menu_item_id": self.item2.id, "qty": 3, "notes": "hot"}] * 15
+		with CaptureQueriesContext(connection) as ctx:
+			items = OrderItem.bulk_add(order, data)
+
+		inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "orders_orderitem"')]
+		self.assertEqual(len(inserts), 1)
+		# kunlik mahsulot jamlanmasi — butun partiya uchun bitta upsert
+		rollup_queries = [q for q in ctx.captured_queries if "reports_" in q["sql"]]
+		self.assertEqual(len(rollup_queries), 1)
+		queries = [q for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+		self.assertLessEqual(len(queries), 5 + len(rollup_queries))
+		self.assertEqual(len(items), 30)
+		self.assertEqual(items[1].item_name_snapshot, "Coffee")
+		self.assertEqual(items[1].line_total, Decimal("6.00"))
+		order.refresh_from_db()
+		self.assertEqual(order.subtotal, Decimal("135.00"))
+
+
+class OrderApiTests(TestCase):
+	def setUp(self):
+		self.user = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		self.table = Table.objects.create(number=1)
+		self.cat = Category.objects.create(name="Drinks")
+		self.item = MenuItem.objects.create(category=self.cat, name="Tea", price=Decimal("1.50"))
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+		for _ in range(3):
+			order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+			OrderItem.objects.create(order=order, menu_item=self.item, qty=2)
+			order.change_status(to_status=Order.Status.COOKING, by_user=self.user)
+
+	def test_list_is_compact_by_default(self):
+		r = self.client.get("/api/orders/")
+		self.assertEqual(r.status_code, 200)
+		row = r.data["results"][0]
+		self.assertNotIn("items", row)
+		self.assertNotIn("status_logs", row)
+		self.assertEqual(row["total"], "3.00")
+
+	def test_list_expand_nested_without_n_plus_one(self):
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.get("/api/orders/?expand=items,status_logs")
+		row = r.data["results"][0]
+		self.assertEqual(row["items"][0]["menu_item_name"], "Tea")
+		self.assertEqual(row["status_logs"][0]["changed_by_username"], "manager")
+		# orders + items + logs (keyset pagination — COUNT yo'q)
+		self.assertEqual(len(ctx.captured_queries), 3)
+
+	def test_order_entry_reads_menu_from_lookup_cache(self):
+		menu_queries = lambda ctx: [q for q in ctx.captured_queries if 'FROM "menu_menuitem"' in q["sql"]]
+		payload = {"order_type": "TAKEAWAY", "customer_name": "Ali", "create_items": [{"menu_item_id": self.item.id, "qty": 2}]}
+		self.client.post("/api/orders/", payload, format="json")  # kesh isiydi
+
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.post("/api/orders/", payload, format="json")
+			self.assertEqual(r.status_code, 201)
+			self.assertEqual(r.data["items"][0]["menu_item_name"], "Tea")
+			order_id = r.data["id"]
+			r = self.client.post(f"/api/orders/{order_id}/add-item/", {"menu_item_id": self.item.id, "qty": 1}, format="json")
+			self.assertEqual(r.status_code, 201)
+			self.assertEqual(r.data["unit_price_snapshot"], "1.50")
+		self.assertEqual(menu_queries(ctx), [])
+
+		self.item.price = Decimal("2.00")
+		self.item.save()
+		r = self.client.post(f"/api/orders/{order_id}/add-item/", {"menu_item_id": self.item.id, "qty": 1}, format="json")
+		self.assertEqual(r.data["unit_price_snapshot"], "2.00")
+
+	def test_create_with_many_lines_updates_rollup_once(self):
+		payload = {"order_type": "TAKEAWAY", "customer_name": "Ali", "create_items": [{"menu_item_id": self.item.id, "qty": 1}] * 30}
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.post("/api/orders/", payload, format="json")
+		self.assertEqual(r.status_code, 201)
+		item_rollup = [q for q in ctx.captured_queries if "reports_dailyitemrollup" in q["sql"]]
+		self.assertEqual(len(item_rollup), 1)
+		# menu + order + status sanog'i + items + mahsulot jamlanmasi + totals (3) + javob (2)
+		self.assertLessEqual(len([q for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]), 10)
+
+	def test_menu_lookup_notices_changes_without_signals(self):
+		order = Order.objects.create(order_type=Order.OrderType.TAKEAWAY, customer_name="Ali", created_by=self.user)
+		add = lambda: self.client.post(f"/api/orders/{order.id}/add-item/", {"menu_item_id": self.item.id, "qty": 1}, format="json")
+		self.assertEqual(add().data["unit_price_snapshot"], "1.50")
+		# boshqa worker / queryset.update — bu jarayonda invalidate() chaqirilmaydi
+		MenuItem.objects.filter(pk=self.item.pk).update(price=Decimal("3.00"))
+
+		later = time.monotonic() + settings.MENU_ITEM_CACHE_TTL + 1
+		with mock.patch("menu.lookup.time.monotonic", return_value=later):
+			self.assertEqual(add().data["unit_price_snapshot"], "3.00")
+			MenuItem.objects.filter(pk=self.item.pk).update(is_available=False)
+		with mock.patch("menu.lookup.time.monotonic", return_value=later + settings.MENU_ITEM_CACHE_TTL + 1):
+			self.assertEqual(add().status_code, 400)
+
+	def test_unavailable_menu_item_rejected(self):
+		self.item.is_available = False
+		self.item.save()
+		payload = {"order_type": "TAKEAWAY", "customer_name": "Ali", "create_items": [{"menu_item_id": self.item.id, "qty": 1}]}
+		r = self.client.post("/api/orders/", payload, format="json")
+		self.assertEqual(r.status_code, 400)
+		order = Order.objects.first()
+		r = self.client.post(f"/api/orders/{order.id}/add-item/", {"menu_item_id": self.item.id, "qty": 1}, format="json")
+		self.assertEqual(r.status_code, 400)
+		self.assertIn("mavjud emas", str(r.data))
+
+	def test_keyset_pagination_walks_all_pages(self):
+		seen = []
+		url = "/api/orders/?page_size=2"
+		while url:
+			r = self.client.get(url)
+			self.assertEqual(r.status_code, 200)
+			self.assertNotIn("count", r.data)
+			seen += [row["id"] for row in r.data["results"]]
+			url = r.data["next"]
+		self.assertEqual(seen, sorted(Order.objects.values_list("id", flat=True), reverse=True))
+
+	def test_page_number_fallback(self):
+		r = self.client.get("/api/orders/?page=1")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(r.data["count"], 3)
+
+	def test_ordering_param_falls_back_to_page_numbers(self):
+		first = Order.objects.order_by("id").first()
+		OrderItem.objects.create(order=first, menu_item=self.item, qty=5)
+		r = self.client.get("/api/orders/?ordering=-total")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(r.data["count"], 3)
+		self.assertEqual(r.data["results"][0]["id"], first.id)
+		r = self.client.get("/api/orders/?ordering=id&page_size=2")
+		self.assertEqual([row["id"] for row in r.data["results"]], sorted(Order.objects.values_list("id", flat=True))[:2])
+
+	def test_patch_with_stale_if_match_conflicts(self):
+		order = Order.objects.first()
+		r = self.client.get(f"/api/orders/{order.id}/")
+		etag = r["ETag"]
+
+		r = self.client.patch(f"/api/orders/{order.id}/", {"notes": "birinchi"}, format="json", HTTP_IF_MATCH=etag)
+		self.assertEqual(r.status_code, 200)
+		self.assertNotEqual(r["ETag"], etag)
+
+		r = self.client.patch(f"/api/orders/{order.id}/", {"notes": "ikkinchi"}, format="json", HTTP_IF_MATCH=etag)
+		self.assertEqual(r.status_code, 409)
+		order.refresh_from_db()
+		self.assertEqual(order.notes, "birinchi")
+
+	def test_update_status_checks_role_on_locked_row(self):
+		waiter = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		order = Order.objects.create(order_type=Order.OrderType.TAKEAWAY, customer_name="Ali", created_by=waiter)
+		original_lock = Order.lock
+
+		def lock_after_manager_change(instance):
+			# get_object() NEW ni o'qigandan keyin, qulfdan oldin manager COOKING ga o'tkazadi
+			Order.objects.filter(pk=instance.pk).update(status=Order.Status.COOKING)
+			return original_lock(instance)
+
+		self.client.force_authenticate(waiter)
+		with mock.patch.object(Order, "lock", autospec=True, side_effect=lock_after_manager_change):
+			r = self.client.post(f"/api/orders/{order.id}/update-status/", {"to_status": "CANCELED"}, format="json")
+		self.assertEqual(r.status_code, 403)
+		order.refresh_from_db()
+		self.assertNotEqual(order.status, Order.Status.CANCELED)
+		self.assertFalse(order.status_logs.filter(to_status=Order.Status.CANCELED).exists())
+
+	def test_bulk_update_status_per_order_results(self):
+		chef = User.objects.create_user(username="chef", password="pass", role=User.Role.CHEF)
+		ids = list(Order.objects.values_list("pk", flat=True))
+		paid = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		Order.objects.filter(pk=paid.pk).update(status=Order.Status.PAID)
+		self.client.force_authenticate(chef)
+
+		with CaptureQueriesContext(connection) as ctx:
+			r = self.client.post(
+				"/api/orders/bulk-update-status/",
+				{"ids": ids + [paid.pk, 999999], "to_status": "READY"},
+				format="json",
+			)
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(r.data["updated"], 3)
+		self.assertEqual([x["ok"] for x in r.data["results"]], [True, True, True, False, False])
+		log_inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "orders_orderstatuslog"')]
+		self.assertEqual(len(log_inserts), 1)
+		self.assertEqual(Order.objects.filter(status=Order.Status.READY).count(), 3)
+
+		# CHEF bekor qila olmaydi
+		r = self.client.post("/api/orders/bulk-update-status/", {"ids": ids, "to_status": "CANCELED"}, format="json")
+		self.assertEqual(r.data["updated"], 0)
+
+	def test_bulk_cancel_frees_table_and_keeps_rollup(self):
+		from reports import rollup
+
+		ids = list(Order.objects.values_list("pk", flat=True))
+		r = self.client.post("/api/orders/bulk-update-status/", {"ids": ids, "to_status": "CANCELED"}, format="json")
+		self.assertEqual(r.data["updated"], 3)
+		self.table.refresh_from_db()
+		self.assertEqual(self.table.active_order_count, 0)
+		self.assertEqual(self.table.status, Table.Status.FREE)
+		self.assertEqual(Order.objects.filter(is_closed=True).count(), 3)
+
+		today = timezone.localdate()
+		self.assertEqual(rollup.stored_day(today)[0], rollup.compute_day(today)[0])
+
+		r = self.client.post("/api/orders/bulk-update-status/", {"ids": [], "to_status": "CANCELED"}, format="json")
+		self.assertEqual(r.status_code, 400)
+		r = self.client.post("/api/orders/bulk-update-status/", {"ids": ids, "to_status": "PAID"}, format="json")
+		self.assertEqual(r.status_code, 403)
+
+	@override_settings(KITCHEN_CURSOR_LAG=0)
+	def test_kitchen_queue_and_since_deltas(self):
+		chef = User.objects.create_user(username="chef", password="pass", role=User.Role.CHEF)
+		self.client.force_authenticate(chef)
+		r = self.client.get("/api/orders/kitchen/")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(len(r.data["orders"]), 3)
+		self.assertEqual(r.data["orders"][0]["items"][0]["qty"], 2)
+		cursor = r.data["cursor"]
+
+		r = self.client.get(f"/api/orders/kitchen/?since={cursor}")
+		self.assertEqual((r.data["orders"], r.data["removed"], r.data["cursor"]), ([], [], cursor))
+
+		first, second = Order.objects.order_by("id")[:2]
+		first.change_status(to_status=Order.Status.READY, by_user=chef)
+		OrderItem.objects.create(order=second, menu_item=self.item, qty=1)
+		r = self.client.get(f"/api/orders/kitchen/?since={cursor}&wait=0")
+		self.assertEqual(r.data["removed"], [first.id])
+		self.assertEqual([o["id"] for o in r.data["orders"]], [second.id])
+		self.assertEqual(len(r.data["orders"][0]["items"]), 2)
+		self.assertGreater(r.data["cursor"], cursor)
+
+	def test_kitchen_since_rescans_lag_window(self):
+		chef = User.objects.create_user(username="chef", password="pass", role=User.Role.CHEF)
+		self.client.force_authenticate(chef)
+		cursor = self.client.get("/api/orders/kitchen/").data["cursor"]
+		first, second = Order.objects.order_by("id")[:2]
+		# belgisi cursor'dan oldin olingan, lekin keyin commit bo'lgan yozuv
+		Order.objects.filter(pk=first.pk).update(notes="kech", change_seq=cursor - 1_000_000)
+		second.notes = "yangi"
+		second.save(update_fields=["notes"])
+		r = self.client.get(f"/api/orders/kitchen/?since={cursor}")
+		self.assertCountEqual([o["id"] for o in r.data["orders"]], [first.id, second.id, Order.objects.order_by("id")[2].id])
+
+	def test_admin_save_reaches_kitchen_cursor(self):
+		chef = User.objects.create_user(username="chef", password="pass", role=User.Role.CHEF)
+		self.client.force_authenticate(chef)
+		cursor = self.client.get("/api/orders/kitchen/").data["cursor"]
+		order = Order.objects.order_by("id").first()
+		order.notes = "admin"
+		request = APIRequestFactory().post("/admin/")
+		request.user = self.user
+		form = mock.Mock(cleaned_data={})
+		admin.site._registry[Order].save_model(request, order, form, change=True)
+		with override_settings(KITCHEN_CURSOR_LAG=0):
+			r = self.client.get(f"/api/orders/kitchen/?since={cursor}")
+		self.assertEqual([o["id"] for o in r.data["orders"]], [order.id])
+
+
+class OrderEventsTests(TestCase):
+	class RecordingBroker:
+		def __init__(self):
+			self.events = []
+
+		def publish(self, event):
+			self.events.append(event)
+
+	def setUp(self):
+		self.user = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		self.table = Table.objects.create(number=1)
+		self.item = MenuItem.objects.create(category=Category.objects.create(name="Drinks"), name="Tea", price=Decimal("1.50"))
+		self.broker = self.RecordingBroker()
+		self._saved_broker, events._broker = events._broker, self.broker
+		self.addCleanup(setattr, events, "_broker", self._saved_broker)
+
+	def test_status_change_published_after_commit(self):
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		with self.captureOnCommitCallbacks(execute=True):
+			order.change_status(to_status=Order.Status.COOKING, by_user=self.user)
+			self.assertEqual(self.broker.events, [])
+		self.assertEqual(self.broker.events[0]["type"], "status_changed")
+		self.assertEqual(self.broker.events[0]["to_status"], Order.Status.COOKING)
+
+	def test_add_item_published(self):
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		client = APIClient()
+		client.force_authenticate(self.user)
+		with self.captureOnCommitCallbacks(execute=True):
+			r = client.post(f"/api/orders/{order.id}/add-item/", {"menu_item_id": self.item.id, "qty": 2}, format="json")
+		self.assertEqual(r.status_code, 201)
+		self.assertEqual(self.broker.events[0]["type"], "items_added")
+		self.assertEqual(self.broker.events[0]["items"][0]["qty"], 2)
+
+	def test_role_scoping(self):
+		event = {"type": "status_changed", "created_by_id": self.user.id}
+		self.assertTrue(events.visible_to(event, "WAITER", self.user.id))
+		self.assertFalse(events.visible_to(event, "WAITER", self.user.id + 1))
+		self.assertTrue(events.visible_to(event, "CHEF", self.user.id + 1))
+
+	def test_in_process_broker_delivers_across_threads(self):
+		async def scenario():
+			broker = events.InProcessBroker()
+			queue = broker.subscribe()
+			await asyncio.to_thread(broker.publish, {"type": "ping"})
+			event = await asyncio.wait_for(queue.get(), timeout=1)
+			broker.unsubscribe(queue)
+			return event
+
+		self.assertEqual(asyncio.run(scenario()), {"type": "ping"})
+
+
+class OrderEventsStreamTests(TestCase):
+	def setUp(self):
+		self.waiter = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		self.broker = events.InProcessBroker()
+		self._saved_broker, events._broker = events._broker, self.broker
+		self.addCleanup(setattr, events, "_broker", self._saved_broker)
+
+	def test_ticket_issued_and_wsgi_refused(self):
+		client = APIClient()
+		self.assertEqual(client.post("/api/orders/events/ticket/").status_code, 401)
+		client.force_authenticate(self.waiter)
+		r = client.post("/api/orders/events/ticket/")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(streams._user_from_ticket(r.data["ticket"]), self.waiter)
+		# WSGI: cheksiz oqim worker'ni band qilmasin
+		self.assertEqual(self.client.get(f"/api/orders/events/?ticket={r.data['ticket']}").status_code, 503)
+
+	async def test_auth_required(self):
+		self.assertEqual((await self.async_client.get("/api/orders/events/")).status_code, 401)
+		self.assertEqual((await self.async_client.get("/api/orders/events/?ticket=bad")).status_code, 401)
+		ticket = streams.issue_ticket(self.waiter)
+		with override_settings(ORDER_EVENTS_TICKET_TTL=-1):
+			self.assertEqual((await self.async_client.get(f"/api/orders/events/?ticket={ticket}")).status_code, 401)
+
+	async def test_user_without_role_forbidden(self):
+		user = await User.objects.acreate(username="norole", role="")
+		r = await self.async_client.get(f"/api/orders/events/?ticket={streams.issue_ticket(user)}")
+		self.assertEqual(r.status_code, 403)
+
+	async def test_stream_frames_visible_events(self):
+		r = await self.async_client.get(f"/api/orders/events/?ticket={streams.issue_ticket(self.waiter)}")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(r["Content-Type"], "text/event-stream")
+		chunks = aiter(r.streaming_content)
+		self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+
+		self.broker.publish({"type": "status_changed", "order_id": 1, "created_by_id": self.waiter.id + 1})
+		self.broker.publish({"type": "status_changed", "order_id": 2, "created_by_id": self.waiter.id})
+		chunk = await asyncio.wait_for(anext(chunks), timeout=1)
+		self.assertEqual(
+			chunk.decode(),
+			'event: status_changed\ndata: {"type": "status_changed", "order_id": 2, "created_by_id": %d}\n\n' % self.waiter.id,
+		)
+		await chunks.aclose()
+
+	@override_settings(ORDER_EVENTS_MAX_LIFETIME=0.2, ORDER_EVENTS_HEARTBEAT=0.05)
+	async def test_stream_closes_after_max_lifetime(self):
+		r = await self.async_client.get(f"/api/orders/events/?ticket={streams.issue_ticket(self.waiter)}")
+		async def collect():
+			return [chunk async for chunk in r.streaming_content]
+
+		chunks = await asyncio.wait_for(collect(), timeout=2)  # oqim o'zi tugaydi
+		self.assertEqual(chunks[0], b"retry: 3000\n\n")
+		self.assertIn(b": ping\n\n", chunks)
+		self.assertEqual(self.broker._subscribers, {})
+
+
+class OrderConcurrencyTests(TransactionTestCase):
+	"""Bir buyurtma ustida parallel o'zgarishlar (PostgreSQL: FOR UPDATE, SQLite: DB-level lock)."""
+
+	def setUp(self):
+		if connection.vendor not in ("sqlite", "postgresql"):
+			self.skipTest("Faqat SQLite/PostgreSQL.")
+		self.user = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		item = MenuItem.objects.create(category=Category.objects.create(name="Drinks"), name="Tea", price=Decimal("10.00"))
+		self.order = Order.objects.create(order_type=Order.OrderType.TAKEAWAY, customer_name="Ali", created_by=self.user)
+		OrderItem.objects.create(order=self.order, menu_item=item, qty=1)
+
+	def _run_parallel(self, target, count=8):
+		barrier = threading.Barrier(count)
+		results = []
+
+		def worker():
+			try:
+				barrier.wait()
+				for _ in range(100):
+					try:
+						results.append(target())
+						break
+					except OperationalError:
+						# SQLite: "database is locked" — qayta urinamiz
+						time.sleep(0.01)
+			finally:
+				close_old_connections()
+				connection.close()
+
+		threads = [threading.Thread(target=worker) for _ in range(count)]
+		for t in threads:
+			t.start()
+		for t in threads:
+			t.join()
+		return results
+
+	def test_parallel_status_change_logs_once(self):
+		def transition():
+			Order.objects.get(pk=self.order.pk).change_status(Order.Status.COOKING, by_user=self.user)
+			return True
+
+		self._run_parallel(transition)
+		self.assertEqual(OrderStatusLog.objects.filter(order=self.order, to_status=Order.Status.COOKING).count(), 1)
+
+	def test_parallel_full_payments_accept_one(self):
+		for status in (Order.Status.COOKING, Order.Status.READY, Order.Status.SERVED):
+			self.order.change_status(status, by_user=self.user)
+
+		def pay():
+			client = APIClient()
+			client.force_authenticate(self.user)
+			return client.post("/api/payments/", {"order": self.order.pk, "method": "CASH", "amount": "10.00"}, format="json").status_code
+
+		codes = self._run_parallel(pay)
+		self.assertTrue(set(codes) <= {201, 400}, codes)
+		self.assertEqual(Payment.objects.filter(order=self.order).count(), 1)
+		self.order.refresh_from_db()
+		self.assertEqual(self.order.status, Order.Status.PAID)
+		self.assertEqual(self.order.paid_total, Decimal("10.00"))
+		self.assertEqual(self.order.due_amount, Decimal("0.00"))
+		self.assertEqual(OrderStatusLog.objects.filter(order=self.order, to_status=Order.Status.PAID).count(), 1)
@@ -1,4 +1,10 @@
-from django.core.exceptions import ValidationError
+from django.core.exceptions import PermissionDenied, ValidationError
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Prefetch
+from django.utils.cache import parse_etags
 from django.utils.dateparse import parse_date
 from rest_framework import status as http_status
 from rest_framework.decorators import action
@@ -6,37 +12,73 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from config.dates import filter_date_window
+from config.export import ExportMixin
+from config.pagination import KeysetPagination
 from accounts.permissions import _role
-from .models import Order, OrderItem
-from .serializers import OrderSerializer, OrderItemSerializer, OrderCreateItemInputSerializer
-
-# ─────────────────────────────────────────────────────────────
-#  Rol asosida qaysi statusga kim o'ta olishi — MARKAZIY QOIDA
-# ─────────────────────────────────────────────────────────────
-#  MUHIM: SERVED → PAID yo'q! PAID faqat to'lov orqali avtomatik.
-STATUS_TRANSITION_ROLES = {
-    # (from_status, to_status): {rollar seti}
-    (Order.Status.NEW,     Order.Status.COOKING):  {"MANAGER", "CHEF"},
-    (Order.Status.COOKING, Order.Status.READY):    {"MANAGER", "CHEF"},
-    (Order.Status.READY,   Order.Status.SERVED):   {"MANAGER", "WAITER"},
-    # CANCELED — kimlar qila oladi:
-    (Order.Status.NEW,     Order.Status.CANCELED): {"MANAGER", "WAITER"},
-    (Order.Status.COOKING, Order.Status.CANCELED): {"MANAGER"},
-    (Order.Status.READY,   Order.Status.CANCELED): {"MANAGER"},
-    (Order.Status.SERVED,  Order.Status.CANCELED): {"MANAGER"},
+from . import events
+from .models import (
+    Order, OrderItem, OrderStatusLog,
+    bulk_change_status, change_stamp, order_stats, recalculation_scope,
+)
+from .serializers import (
+    OrderSerializer, OrderListSerializer, OrderItemSerializer, OrderCreateItemInputSerializer,
+    KitchenOrderSerializer,
+)
+
+# Nested maydonlar uchun prefetch — har bir log/element user/menu_item ni lazy yuklamasin
+ORDER_PREFETCHES = {
+    "items": Prefetch("items", queryset=OrderItem.objects.select_related("menu_item")),
+    "status_logs": Prefetch("status_logs", queryset=OrderStatusLog.objects.select_related("changed_by")),
 }
 
-class OrderViewSet(ModelViewSet):
-    queryset = Order.objects.select_related(
-        "table", "created_by"
-    ).prefetch_related("items", "status_logs").all()
+
+KITCHEN_STATUSES = (Order.Status.NEW, Order.Status.COOKING)
+
+BULK_STATUS_MAX_IDS = 200
+
+
+class OrderViewSet(ExportMixin, ModelViewSet):
+    queryset = Order.objects.select_related("table", "created_by").all()
     serializer_class = OrderSerializer
+    pagination_class = KeysetPagination
+    keyset_fields = ("created_at", "id")
     permission_classes = [IsAuthenticated]
     ordering_fields = ["created_at", "total", "status", "id"]
     search_fields = ["order_code", "customer_name", "customer_phone", "notes"]
+    export_filename = "buyurtmalar"
+    export_fields = (
+        ("ID", "id"), ("Kod", "order_code"), ("Turi", "order_type"), ("Holati", "status"),
+        ("Stol", "table__number"), ("Mijoz", "customer_name"), ("Telefon", "customer_phone"),
+        ("Ofitsiant", "created_by__username"), ("Oraliq summa", "subtotal"),
+        ("Chegirma", "discount_amount"), ("Jami", "total"), ("To'langan", "paid_total"),
+        ("Qoldiq", "due_amount"), ("Yaratilgan", "created_at"),
+    )
+
+    def _expand(self):
+        """?expand=items,status_logs — faqat list uchun."""
+        raw = self.request.query_params.get("expand", "")
+        return {p.strip() for p in raw.split(",")} & set(OrderListSerializer.EXPANDABLE)
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return OrderListSerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "list":
+            context["expand"] = self._expand()
+        return context
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "list":
+            prefetch_keys = self._expand()
+        else:
+            prefetch_keys = ORDER_PREFETCHES.keys()
+        qs = qs.prefetch_related(*(ORDER_PREFETCHES[k] for k in sorted(prefetch_keys)))
+
         role = _role(self.request.user)
 
         # CHEF hamma buyurtmani ko'radi (oshxonada ishlashi uchun)
@@ -54,14 +96,11 @@ class OrderViewSet(ModelViewSet):
             qs = qs.filter(status=status_)
         if table:
             qs = qs.filter(table_id=table)
-        if date_from:
-            d1 = parse_date(date_from)
-            if d1:
-                qs = qs.filter(created_at__date__gte=d1)
-        if date_to:
-            d2 = parse_date(date_to)
-            if d2:
-                qs = qs.filter(created_at__date__lte=d2)
+        qs = filter_date_window(
+            qs, "created_at",
+            parse_date(date_from) if date_from else None,
+            parse_date(date_to) if date_to else None,
+        )
 
         return qs
 
@@ -72,14 +111,41 @@ class OrderViewSet(ModelViewSet):
             raise PermissionDenied("Faqat MANAGER yoki WAITER buyurtma yarata oladi.")
         serializer.save(created_by=self.request.user)
 
+    @staticmethod
+    def _etag(order):
+        return f'"{order.version}"'
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        response["ETag"] = f'"{response.data["version"]}"'
+        return response
+
     def update(self, request, *args, **kwargs):
+        """
+        If-Match: "<version>" berilsa — qator qulflanib versiya tekshiriladi;
+        boshqa client oldinroq o'zgartirgan bo'lsa 409 Conflict.
+        """
         role = _role(request.user)
         if role == "CHEF":
             return Response(
                 {"detail": "CHEF buyurtmani tahrir qila olmaydi."},
                 status=http_status.HTTP_403_FORBIDDEN,
             )
-        return super().update(request, *args, **kwargs)
+        with transaction.atomic():
+            order = self.get_object().lock()
+            if_match = request.headers.get("If-Match")
+            if if_match and if_match.strip() != "*":
+                expected = [tag.removeprefix("W/") for tag in parse_etags(if_match)]
+                if self._etag(order) not in expected:
+                    return Response(
+                        {"detail": "Buyurtma boshqa foydalanuvchi tomonidan o'zgartirilgan.", "version": order.version},
+                        status=http_status.HTTP_409_CONFLICT,
+                        headers={"ETag": self._etag(order)},
+                    )
+            response = super().update(request, *args, **kwargs)
+        if "version" in response.data:
+            response["ETag"] = f'"{response.data["version"]}"'
+        return response
 
     def partial_update(self, request, *args, **kwargs):
         role = _role(request.user)
@@ -114,25 +180,29 @@ class OrderViewSet(ModelViewSet):
                 status=http_status.HTTP_403_FORBIDDEN,
             )
 
-        # Yopiq buyurtmaga element qo'shib bo'lmaydi
-        if order.status in (Order.Status.PAID, Order.Status.CANCELED):
-            return Response(
-                {"detail": "Yopiq buyurtmaga element qo'shib bo'lmaydi."},
-                status=http_status.HTTP_400_BAD_REQUEST,
-            )
-
         input_ser = OrderCreateItemInputSerializer(data=request.data)
         if not input_ser.is_valid():
             return Response(input_ser.errors, status=http_status.HTTP_400_BAD_REQUEST)
 
         data = input_ser.validated_data
-        item = OrderItem.objects.create(
-            order=order,
-            menu_item_id=data["menu_item_id"],
-            qty=data["qty"],
-            notes=data.get("notes", ""),
-        )
-        order.recalculate_totals()
+        with recalculation_scope():
+            # qulf: parallel to'lov/yopilish bilan poyga bo'lmasin
+            order.lock()
+
+            # Yopiq buyurtmaga element qo'shib bo'lmaydi
+            if order.status in (Order.Status.PAID, Order.Status.CANCELED):
+                return Response(
+                    {"detail": "Yopiq buyurtmaga element qo'shib bo'lmaydi."},
+                    status=http_status.HTTP_400_BAD_REQUEST,
+                )
+
+            item = OrderItem.objects.create(
+                order=order,
+                menu_item_id=data["menu_item_id"],
+                qty=data["qty"],
+                notes=data.get("notes", ""),
+            )
+            events.items_added(order, [item])
         return Response(
             OrderItemSerializer(item, context={"request": request}).data,
             status=http_status.HTTP_201_CREATED,
@@ -163,26 +233,13 @@ class OrderViewSet(ModelViewSet):
                 status=http_status.HTTP_403_FORBIDDEN,
             )
 
-        role        = _role(request.user)
-        from_status = order.status
-        key         = (from_status, to_status)
-        allowed_roles = STATUS_TRANSITION_ROLES.get(key, set())
-
-        if role not in allowed_roles:
-            return Response(
-                {"detail": f"Ruxsat yo'q: {role} — {from_status} → {to_status}"},
-                status=http_status.HTTP_403_FORBIDDEN,
-            )
-
-        # WAITER faqat o'z buyurtmasini o'zgartira oladi
-        if role == "WAITER" and order.created_by_id != request.user.id:
-            return Response(
-                {"detail": "Bu buyurtma sizga tegishli emas."},
-                status=http_status.HTTP_403_FORBIDDEN,
-            )
-
+        # rol va egalik change_status ichida, qulflangan qator bo'yicha tekshiriladi
         try:
-            order.change_status(to_status=to_status, by_user=request.user, comment=comment)
+            order.change_status(
+                to_status=to_status, by_user=request.user, comment=comment, role=_role(request.user),
+            )
+        except PermissionDenied as e:
+            return Response({"detail": str(e)}, status=http_status.HTTP_403_FORBIDDEN)
         except (ValidationError, Exception) as e:
             return Response({"detail": str(e)}, status=http_status.HTTP_400_BAD_REQUEST)
 
@@ -191,11 +248,47 @@ class OrderViewSet(ModelViewSet):
             status=http_status.HTTP_200_OK,
         )
 
+    @action(detail=False, methods=["post"], url_path="bulk-update-status")
+    def bulk_update_status(self, request):
+        """
+        Bir nechta buyurtmani bitta so'rovda o'tkazish (masalan oshxona: NEW → COOKING).
+        Body: {"ids": [..], "to_status": "...", "comment": ""}. Har bir buyurtma uchun natija qaytadi.
+        """
+        ids = request.data.get("ids")
+        to_status = (request.data.get("to_status") or request.data.get("status") or "").strip()
+        comment = request.data.get("comment", "")
+
+        if not isinstance(ids, list) or not ids or len(ids) > BULK_STATUS_MAX_IDS:
+            return Response(
+                {"detail": f"'ids' 1..{BULK_STATUS_MAX_IDS} ta buyurtma id'sidan iborat ro'yxat bo'lishi kerak."},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            return Response({"detail": "'ids' faqat butun sonlardan iborat bo'lishi kerak."}, status=http_status.HTTP_400_BAD_REQUEST)
+
+        if to_status not in Order.Status.values:
+            return Response({"detail": "'to_status' noto'g'ri yoki berilmagan."}, status=http_status.HTTP_400_BAD_REQUEST)
+
+        # PAID ga manual o'tish taqiqlangan — faqat to'lov orqali avtomatik
+        if to_status == Order.Status.PAID:
+            return Response(
+                {"detail": "PAID statusi faqat to'lov to'liq qilingandan keyin avtomatik o'rnatiladi."},
+                status=http_status.HTTP_403_FORBIDDEN,
+            )
+
+        # rol va egalik (WAITER) tekshiruvi har bir buyurtma uchun bulk_change_status ichida
+        results = bulk_change_status(ids, to_status, by_user=request.user, role=_role(request.user), comment=comment)
+        return Response({
+            "updated": sum(r["ok"] for r in results),
+            "results": results,
+        })
+
     # ── WAITER statistikasi ──
     @action(detail=False, methods=["get"], url_path="my-stats")
     def my_stats(self, request):
         """Waiter o'z buyurtmalarining qisqa statistikasini ko'radi."""
-        from django.db.models import Count, Sum
         role = _role(request.user)
         if role not in ("MANAGER", "WAITER"):
             return Response({"detail": "Ruxsat yo'q."}, status=http_status.HTTP_403_FORBIDDEN)
@@ -204,17 +297,58 @@ class OrderViewSet(ModelViewSet):
 
         date_from = parse_date(request.query_params.get("date_from", ""))
         date_to   = parse_date(request.query_params.get("date_to", ""))
-        if date_from:
-            qs = qs.filter(created_at__date__gte=date_from)
-        if date_to:
-            qs = qs.filter(created_at__date__lte=date_to)
+        qs = filter_date_window(qs, "created_at", date_from, date_to)
 
-        total_orders  = qs.count()
-        by_status     = qs.values("status").annotate(count=Count("id"))
-        total_revenue = qs.filter(status=Order.Status.PAID).aggregate(s=Sum("total"))["s"] or 0
+        return Response(order_stats(qs))
 
+    # ── Oshxona navbati ──
+    @action(detail=False, methods=["get"], url_path="kitchen", pagination_class=None)
+    def kitchen(self, request):
+        """
+        NEW/COOKING buyurtmalar, eng eskisi birinchi (teng bo'lsa — uzoq tayyorlanadigani).
+        ?since=<cursor> — faqat o'zgarganlar: navbatdagilar `orders` da, navbatdan chiqqanlar
+        `removed` da; cursor'dan KITCHEN_CURSOR_LAG soniya oldingi o'zgarishlar ham qayta
+        kelishi mumkin (idempotent). Standart holatda darhol javob qaytaradi; ?wait=<soniya> berilsa
+        (KITCHEN_LONG_POLL_TIMEOUT gacha) o'zgarish bo'lmaguncha kutadi — long-poll sync
+        worker'ni band qiladi, shuning uchun faqat so'ralganda yoqiladi.
+        """
+        if _role(request.user) not in ("MANAGER", "CHEF"):
+            return Response({"detail": "Ruxsat yo'q."}, status=http_status.HTTP_403_FORBIDDEN)
+
+        since = request.query_params.get("since")
+        try:
+            since = int(since) if since not in (None, "") else None
+            wait = float(request.query_params.get("wait", 0))
+        except ValueError:
+            return Response({"detail": "since/wait son bo'lishi kerak."}, status=http_status.HTTP_400_BAD_REQUEST)
+        wait = max(0.0, min(wait, settings.KITCHEN_LONG_POLL_TIMEOUT))
+
+        if since is not None:
+            deadline = time.monotonic() + wait
+            while not Order.objects.filter(change_seq__gt=since).exists():
+                if time.monotonic() >= deadline:
+                    return Response({"cursor": since, "orders": [], "removed": []})
+                time.sleep(settings.KITCHEN_LONG_POLL_INTERVAL)
+
+        # cursor ma'lumotdan OLDIN olinadi — oradagi o'zgarish keyingi so'rovda yana keladi
+        cursor = change_stamp()
+        qs = Order.objects.filter(status__in=KITCHEN_STATUSES)
+        removed = []
+        if since is not None:
+            # belgi commit'dan oldin olinadi — kechikib commit bo'lganlar uchun oyna pastga
+            # kengaytiriladi; takror kelgan buyurtmalarni client shunchaki yangilaydi
+            since -= settings.KITCHEN_CURSOR_LAG * 1_000_000
+            changed = Order.objects.filter(change_seq__gt=since)
+            removed = list(changed.exclude(status__in=KITCHEN_STATUSES).values_list("id", flat=True))
+            qs = qs.filter(change_seq__gt=since)
+
+        qs = (
+            qs.annotate(max_prep_minutes=Max("items__menu_item__prep_time_minutes"))
+            .prefetch_related(Prefetch("items", queryset=OrderItem.objects.select_related("menu_item")))
+            .order_by("created_at", "-max_prep_minutes", "id")
+        )
         return Response({
-            "total_orders": total_orders,
-            "by_status": list(by_status),
-            "total_revenue_paid": total_revenue,
+            "cursor": cursor,
+            "orders": KitchenOrderSerializer(qs, many=True).data,
+            "removed": removed,
         })
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.28 on 2026-10-18 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_alter_payment_options_alter_payment_amount_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['is_debt', 'paid_at'], name='payment_debt_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['received_by', 'paid_at'], name='payment_receiver_paid_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['paid_at', 'id'], name='payment_paid_id_idx'),
+        ),
+    ]
@@ -37,15 +37,21 @@ class Payment(models.Model):
         ordering            = ["-paid_at"]
         verbose_name        = "To'lov"
         verbose_name_plural = "To'lovlar"
+        indexes = [
+            models.Index(fields=["is_debt", "paid_at"], name="payment_debt_paid_idx"),
+            models.Index(fields=["received_by", "paid_at"], name="payment_receiver_paid_idx"),
+            # keyset pagination tartibi (-paid_at, -id)
+            models.Index(fields=["paid_at", "id"], name="payment_paid_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.get_method_display()} — {self.amount} (Buyurtma #{self.order_id})"
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        self.order.recalculate_totals()
+        self.order.schedule_recalculation()
 
     def delete(self, *args, **kwargs):
         order = self.order
         super().delete(*args, **kwargs)
-        order.recalculate_totals()
+        order.schedule_recalculation()
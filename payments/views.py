@@ -1,21 +1,32 @@
 from decimal import Decimal
 
+from django.db import transaction
 from rest_framework import status as http_status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from config.export import ExportMixin
+from config.pagination import KeysetPagination
 from accounts.permissions import _role
 from orders.models import Order
 from .models import Payment
 from .serializers import PaymentSerializer
 
 
-class PaymentViewSet(ModelViewSet):
+class PaymentViewSet(ExportMixin, ModelViewSet):
     queryset = Payment.objects.select_related("order", "received_by").all()
     serializer_class = PaymentSerializer
+    pagination_class = KeysetPagination
+    keyset_fields = ("paid_at", "id")
     permission_classes = [IsAuthenticated]
     ordering_fields = ["paid_at", "amount", "id"]
+    export_filename = "tolovlar"
+    export_fields = (
+        ("ID", "id"), ("Buyurtma", "order__order_code"), ("Usul", "method"), ("Miqdori", "amount"),
+        ("Qarzmi", "is_debt"), ("Qarz izohi", "debt_note"), ("Qabul qiluvchi", "received_by__username"),
+        ("To'langan vaqt", "paid_at"),
+    )
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -49,29 +60,33 @@ class PaymentViewSet(ModelViewSet):
                     status=http_status.HTTP_403_FORBIDDEN,
                 )
 
-        # To'lov qabul qilish uchun buyurtma SERVED bo'lishi shart
-        if order and order.status != Order.Status.SERVED:
-            return Response(
-                {"detail": f"To'lov faqat SERVED holatdagi buyurtmaga qo'shiladi. Hozirgi holat: {order.status}"},
-                status=http_status.HTTP_400_BAD_REQUEST,
-            )
-
-        payment = serializer.save(received_by=request.user)
+        with transaction.atomic():
+            # Buyurtma qatori qulflanadi: ikki ofitsiant bir hisobni bir vaqtda to'lay olmaydi
+            if order:
+                order.lock()
 
-        # To'lov saqlangandan keyin buyurtmani yangilash
-        order = payment.order
-        order.refresh_from_db()
-
-        # due_amount == 0 bo'lsa avtomatik PAID
-        if order.status == Order.Status.SERVED and order.due_amount <= Decimal("0.00"):
-            try:
-                order.change_status(
-                    Order.Status.PAID,
-                    by_user=request.user,
-                    comment="Avtomatik: to'lov to'liq amalga oshirildi",
+            # To'lov qabul qilish uchun buyurtma SERVED bo'lishi shart
+            if order and order.status != Order.Status.SERVED:
+                return Response(
+                    {"detail": f"To'lov faqat SERVED holatdagi buyurtmaga qo'shiladi. Hozirgi holat: {order.status}"},
+                    status=http_status.HTTP_400_BAD_REQUEST,
                 )
-            except Exception:
-                pass
+
+            payment = serializer.save(received_by=request.user)
+
+            # To'lov saqlangandan keyin buyurtma totals'i instance'da yangilangan (recalculate_totals)
+            order = payment.order
+
+            # due_amount == 0 bo'lsa avtomatik PAID
+            if order.status == Order.Status.SERVED and order.due_amount <= Decimal("0.00"):
+                try:
+                    order.change_status(
+                        Order.Status.PAID,
+                        by_user=request.user,
+                        comment="Avtomatik: to'lov to'liq amalga oshirildi",
+                    )
+                except Exception:
+                    pass
 
         return Response(
             PaymentSerializer(payment, context={"request": request}).data,
@@ -0,0 +1,159 @@
+"""
+Savdo tahlili: soat × hafta kuni issiqlik xaritasi, hafta kunlari bo'yicha o'rtacha,
+savat hajmi taqsimoti va birga olinadigan mahsulotlar.
+
+PostgreSQL'da soat × hafta kuni guruhlash bazada (ExtractIsoWeekDay/ExtractHour, tzinfo bilan) —
+Python'ga faqat 7×24 qator keladi. Boshqa bazalarda (SQLite) ustunlar
+`values_list(...).iterator(chunk_size=...)` bilan bo'laklab o'qiladi va bir o'tishda hisoblanadi:
+SQLite'da Extract har qator uchun Python funksiyasi, bu yo'l undan bir necha barobar tez.
+Savat hajmi har ikkala holatda bazada GROUP BY bilan.
+Bekor qilingan buyurtmalar hisobga olinmaydi; tushum — qarz bo'lmagan to'lovlar (paid_at bo'yicha).
+Vaqtlar settings.TIME_ZONE da. View'lar natijani reports.cache orqali keshlaydi.
+"""
+import heapq
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from itertools import combinations, groupby
+from operator import itemgetter
+
+from django.db import connection
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, ExtractHour, ExtractIsoWeekDay
+from django.utils import timezone
+
+from config.dates import filter_date_window
+from orders.models import Order, OrderItem
+from payments.models import Payment
+
+CHUNK_SIZE = 5000
+
+WEEKDAYS = ("Dushanba", "Seshanba", "Chorshanba", "Payshanba", "Juma", "Shanba", "Yakshanba")
+
+
+def _orders(date_from, date_to):
+    return filter_date_window(
+        Order.objects.exclude(status=Order.Status.CANCELED), "created_at", date_from, date_to
+    ).order_by()
+
+
+def _group_in_db():
+    return connection.vendor == "postgresql"
+
+
+def _hourly(queryset, field, value=None):
+    """[(hafta kuni 0..6, soat, son yoki summa)] — PostgreSQL'da GROUP BY, boshqa bazada Python."""
+    tz = timezone.get_current_timezone()
+    if _group_in_db():
+        rows = (
+            queryset.annotate(wd=ExtractIsoWeekDay(field, tzinfo=tz), hour=ExtractHour(field, tzinfo=tz))
+            .values("wd", "hour")
+            .annotate(total=Sum(value) if value else Count("pk"))
+            .values_list("wd", "hour", "total")
+        )
+        return [(wd - 1, hour, total) for wd, hour, total in rows]
+
+    columns = (field, value) if value else (field,)
+    grid = Counter()
+    for row in queryset.values_list(*columns).iterator(chunk_size=CHUNK_SIZE):
+        local = row[0].astimezone(tz)
+        grid[local.weekday(), local.hour] += row[1] if value else 1
+    return [(wd, hour, total) for (wd, hour), total in grid.items()]
+
+
+def heatmap(date_from, date_to):
+    """orders[kun][soat] va revenue[kun][soat]; kun 0 — dushanba."""
+    orders = [[0] * 24 for _ in WEEKDAYS]
+    revenue = [[Decimal("0.00")] * 24 for _ in WEEKDAYS]
+
+    for wd, hour, count in _hourly(_orders(date_from, date_to), "created_at"):
+        orders[wd][hour] = count
+
+    payments = filter_date_window(Payment.objects.filter(is_debt=False), "paid_at", date_from, date_to).order_by()
+    for wd, hour, amount in _hourly(payments, "paid_at", "amount"):
+        revenue[wd][hour] = amount
+
+    return {"weekdays": list(WEEKDAYS), "orders": orders, "revenue": revenue}
+
+
+def weekday_pattern(date_from, date_to):
+    """Hafta kunlari bo'yicha jami va shu kunlar soniga bo'lingan o'rtacha (heatmap'dan)."""
+    grid = heatmap(date_from, date_to)
+    days = [0] * 7
+    for offset in range((date_to - date_from).days + 1):
+        days[(date_from + timedelta(days=offset)).weekday()] += 1
+
+    rows = []
+    for i, name in enumerate(WEEKDAYS):
+        orders = sum(grid["orders"][i])
+        revenue = sum(grid["revenue"][i], Decimal("0.00"))
+        rows.append({
+            "weekday": name,
+            "days": days[i],
+            "orders": orders,
+            "revenue": revenue,
+            "avg_orders": round(orders / days[i], 2) if days[i] else 0,
+            "avg_revenue": (revenue / days[i]).quantize(Decimal("0.01")) if days[i] else Decimal("0.00"),
+            "peak_hour": max(range(24), key=grid["orders"][i].__getitem__) if orders else None,
+        })
+    return {"weekdays": rows}
+
+
+def _percentile(distribution, total, q):
+    """distribution: [(qiymat, soni), ...] o'sish tartibida."""
+    threshold = q * total
+    seen = 0
+    for value, count in distribution:
+        seen += count
+        if seen >= threshold:
+            return value
+    return None
+
+
+def basket_sizes(date_from, date_to):
+    """Buyurtmadagi mahsulotlar soni (qty yig'indisi) taqsimoti."""
+    qty = (
+        OrderItem.objects.filter(order=OuterRef("pk")).order_by()
+        .values("order").annotate(total=Sum("qty")).values("total")
+    )
+    distribution = list(
+        _orders(date_from, date_to)
+        .annotate(size=Coalesce(Subquery(qty), 0))
+        .values("size")
+        .annotate(orders=Count("id"))
+        .order_by("size")
+        .values_list("size", "orders")
+    )
+    total = sum(count for _, count in distribution)
+    return {
+        "orders": total,
+        "mean": round(sum(size * count for size, count in distribution) / total, 2) if total else 0,
+        "p50": _percentile(distribution, total, 0.5),
+        "p90": _percentile(distribution, total, 0.9),
+        "distribution": [{"size": size, "orders": count} for size, count in distribution],
+    }
+
+
+def co_occurrence(date_from, date_to, top_n=20):
+    """Bitta buyurtmada birga uchraydigan mahsulot juftliklari (item_name_snapshot bo'yicha)."""
+    rows = (
+        filter_date_window(OrderItem.objects.all(), "order__created_at", date_from, date_to)
+        .exclude(order__status=Order.Status.CANCELED)
+        .order_by("order_id")
+        .values_list("order_id", "item_name_snapshot")
+    )
+    total, pairs = 0, Counter()
+    for _, lines in groupby(rows.iterator(chunk_size=CHUNK_SIZE), key=itemgetter(0)):
+        total += 1
+        pairs.update(combinations(sorted({name for _, name in lines}), 2))
+    # elementsiz buyurtmalar ham ulushning maxrajiga kiradi
+    total += _orders(date_from, date_to).filter(items__isnull=True).count()
+
+    top = heapq.nsmallest(top_n, pairs.items(), key=lambda pair: (-pair[1], pair[0]))
+    return {
+        "orders": total,
+        "pairs": [
+            {"items": list(names), "orders": count, "share": round(count / total, 4)}
+            for names, count in top
+        ],
+    }
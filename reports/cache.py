@@ -0,0 +1,76 @@
+"""
+Hisobot javoblari uchun kesh (Django cache framework ustida).
+
+Kalit: (endpoint, date_from, date_to, davr digest'i). Digest bazadan olinadi — davrdagi
+DailySalesRollup/DailyItemRollup qatorlari soni va Max(updated_at); Payment/Expense/OrderItem/Order
+yozuvi jamlanmani (rollup) o'zgartiradi, digest almashadi va eski kesh yozuvi ishlatilmaydi.
+Shu sababli barcha worker'lar (har birining o'z locmem keshi bo'lsa ham) bir xil natija beradi.
+Bugungi (yoki kelajak) kun REPORT_CACHE_TODAY_TTL, o'tgan kunlar REPORT_CACHE_PAST_TTL soniya
+saqlanadi — updated_at commit'dan oldin olinadi, muddat kechikkan commit'lar uchun zaxira.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import DailyItemRollup, DailySalesRollup
+
+KEY_PREFIX = "reports"
+HITS_KEY = f"{KEY_PREFIX}:stats:hits"
+MISSES_KEY = f"{KEY_PREFIX}:stats:misses"
+
+
+def _cache():
+    return caches[getattr(settings, "REPORT_CACHE_ALIAS", "default")]
+
+
+def _range_digest(date_from, date_to):
+    days = (date_to - date_from).days + 1
+    if not 0 < days <= settings.REPORT_MAX_RANGE_DAYS:
+        raise ValueError(f"Davr 1..{settings.REPORT_MAX_RANGE_DAYS} kun bo'lishi kerak.")
+    state = [
+        tuple(
+            model.objects.filter(date__gte=date_from, date__lte=date_to)
+            .aggregate(n=Count("id"), at=Max("updated_at")).values()
+        )
+        for model in (DailySalesRollup, DailyItemRollup)
+    ]
+    return hashlib.md5(repr(state).encode()).hexdigest()
+
+
+def _incr(cache, key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def cached_report(endpoint, date_from, date_to, build):
+    """(data, hit) qaytaradi; kesh bo'lmasa build() chaqiriladi."""
+    cache = _cache()
+    # Digest build() dan OLDIN olinadi: orada yozuv bo'lsa, natija eski kalitga tushadi
+    digest = _range_digest(date_from, date_to)
+    key = f"{KEY_PREFIX}:{endpoint}:{date_from.isoformat()}:{date_to.isoformat()}:{digest}"
+
+    data = cache.get(key)
+    if data is not None:
+        _incr(cache, HITS_KEY)
+        return data, True
+
+    data = build()
+    if date_to < timezone.localdate():
+        timeout = getattr(settings, "REPORT_CACHE_PAST_TTL", 3600)
+    else:
+        timeout = getattr(settings, "REPORT_CACHE_TODAY_TTL", 60)
+    cache.set(key, data, timeout=timeout)
+    _incr(cache, MISSES_KEY)
+    return data, False
+
+
+def stats():
+    cache = _cache()
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {"hits": values.get(HITS_KEY, 0), "misses": values.get(MISSES_KEY, 0)}
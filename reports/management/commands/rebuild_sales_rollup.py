@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from expenses.models import Expense
+from orders.models import Order
+from payments.models import Payment
+from reports import rollup
+
+
+class Command(BaseCommand):
+    help = "Kunlik jamlanmalarni (DailySalesRollup/DailyItemRollup) qayta hisoblaydi yoki tekshiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date-from", help="YYYY-MM-DD (standart: eng birinchi yozuv sanasi)")
+        parser.add_argument("--date-to", help="YYYY-MM-DD (standart: bugun)")
+        parser.add_argument(
+            "--verify", action="store_true",
+            help="Faqat tekshirish: farq bo'lsa xato bilan tugaydi, hech narsa yozilmaydi.",
+        )
+
+    def handle(self, *args, **options):
+        date_from = self._parse(options["date_from"]) or self._first_day()
+        date_to = self._parse(options["date_to"]) or timezone.localdate()
+        if date_from is None:
+            self.stdout.write("Ma'lumot yo'q.")
+            return
+
+        mismatches = []
+        for day in rollup.iter_days(date_from, date_to):
+            if options["verify"]:
+                if rollup.compute_day(day) != rollup.stored_day(day):
+                    mismatches.append(day)
+                    self.stdout.write(self.style.ERROR(f"{day}: mos emas"))
+            else:
+                rollup.rebuild_day(day)
+
+        if options["verify"]:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} kun jamlanmasi xom ma'lumotga mos emas.")
+            self.stdout.write(self.style.SUCCESS(f"{date_from} — {date_to}: hammasi mos."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{date_from} — {date_to}: qayta hisoblandi."))
+
+    def _parse(self, value):
+        if not value:
+            return None
+        d = parse_date(value)
+        if d is None:
+            raise CommandError(f"Sana noto'g'ri: {value}")
+        return d
+
+    def _first_day(self):
+        firsts = [
+            Order.objects.aggregate(m=Min("created_at"))["m"],
+            Payment.objects.aggregate(m=Min("paid_at"))["m"],
+            Expense.objects.aggregate(m=Min("spent_at"))["m"],
+        ]
+        firsts = [timezone.localdate(dt) for dt in firsts if dt]
+        return min(firsts) if firsts else None
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.28 on 2026-10-18 14:31
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyItemRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Sana')),
+                ('item_name_snapshot', models.CharField(max_length=120, verbose_name='Nomi')),
+                ('qty', models.IntegerField(default=0, verbose_name='Soni')),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Summa')),
+            ],
+            options={
+                'verbose_name': 'Kunlik mahsulot jamlanmasi',
+                'verbose_name_plural': 'Kunlik mahsulot jamlanmalari',
+                'ordering': ['-date', '-qty'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Sana')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Tushum')),
+                ('expense', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Xarajat')),
+                ('new_count', models.IntegerField(default=0)),
+                ('cooking_count', models.IntegerField(default=0)),
+                ('ready_count', models.IntegerField(default=0)),
+                ('served_count', models.IntegerField(default=0)),
+                ('paid_count', models.IntegerField(default=0)),
+                ('canceled_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Yangilangan')),
+            ],
+            options={
+                'verbose_name': 'Kunlik jamlanma',
+                'verbose_name_plural': 'Kunlik jamlanmalar',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyitemrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'item_name_snapshot'), name='uniq_item_rollup_per_day'),
+        ),
+    ]
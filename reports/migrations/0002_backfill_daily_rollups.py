@@ -0,0 +1,68 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+STATUSES = ("NEW", "COOKING", "READY", "SERVED", "PAID", "CANCELED")
+
+
+def _by_day(queryset, field, *values, **aggregates):
+    tz = timezone.get_current_timezone()
+    return (
+        queryset.filter(**{f"{field}__isnull": False})
+        .annotate(day=TruncDate(field, tzinfo=tz))
+        .order_by()
+        .values("day", *values)
+        .annotate(**aggregates)
+    )
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    """Mavjud Order/Payment/Expense/OrderItem qatorlaridan jamlanmalar (rollup.compute_day bilan bir xil)."""
+    DailySalesRollup = apps.get_model("reports", "DailySalesRollup")
+    DailyItemRollup = apps.get_model("reports", "DailyItemRollup")
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    Payment = apps.get_model("payments", "Payment")
+    Expense = apps.get_model("expenses", "Expense")
+
+    # signal'lar allaqachon yozgan bo'lsa (qayta ishga tushirish) — rebuild_sales_rollup ishlatiladi
+    if DailySalesRollup.objects.exists() or DailyItemRollup.objects.exists():
+        return
+
+    days = defaultdict(dict)
+    for row in _by_day(Payment.objects.filter(is_debt=False), "paid_at", s=Sum("amount")):
+        days[row["day"]]["revenue"] = row["s"]
+    for row in _by_day(Expense.objects.all(), "spent_at", s=Sum("amount")):
+        days[row["day"]]["expense"] = row["s"]
+    for row in _by_day(Order.objects.filter(status__in=STATUSES), "created_at", "status", n=Count("id")):
+        days[row["day"]][f"{row['status'].lower()}_count"] = row["n"]
+    DailySalesRollup.objects.bulk_create(
+        [DailySalesRollup(date=day, **values) for day, values in days.items()], batch_size=500
+    )
+
+    items = _by_day(OrderItem.objects.all(), "created_at", "item_name_snapshot", qty=Sum("qty"), amount=Sum("line_total"))
+    DailyItemRollup.objects.bulk_create(
+        [
+            DailyItemRollup(date=row["day"], item_name_snapshot=row["item_name_snapshot"], qty=row["qty"], amount=row["amount"])
+            for row in items.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_daily_sales_rollup'),
+        ('orders', '0005_order_version'),
+        ('payments', '0004_hot_filter_indexes'),
+        ('expenses', '0004_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.28 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_backfill_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyitemrollup',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Yangilangan'),
+            preserve_default=False,
+        ),
+    ]
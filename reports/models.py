@@ -1,4 +1,55 @@
+from decimal import Decimal
+
 from django.db import models
 
-# Reports: bu app'da odatda model bo'lmaydi.
-# Hisobotlar view/service layer orqali Order/Payment/Expense dan hisoblanadi.
+# Reports: hisobotlar uchun oldindan yig'ilgan kunlik jamlanmalar.
+# Order/Payment/Expense/OrderItem o'zgarganda reports.signals orqali yangilanadi,
+# `python manage.py rebuild_sales_rollup` to'liq qayta hisoblaydi va tekshiradi.
+
+
+class DailySalesRollup(models.Model):
+    date    = models.DateField(unique=True, verbose_name="Sana")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"), verbose_name="Tushum")
+    expense = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"), verbose_name="Xarajat")
+
+    # Shu kuni yaratilgan buyurtmalar — joriy statusi bo'yicha
+    new_count      = models.IntegerField(default=0)
+    cooking_count  = models.IntegerField(default=0)
+    ready_count    = models.IntegerField(default=0)
+    served_count   = models.IntegerField(default=0)
+    paid_count     = models.IntegerField(default=0)
+    canceled_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan")
+
+    class Meta:
+        ordering            = ["-date"]
+        verbose_name        = "Kunlik jamlanma"
+        verbose_name_plural = "Kunlik jamlanmalar"
+
+    def __str__(self) -> str:
+        return f"{self.date}: {self.revenue} / {self.expense}"
+
+    @staticmethod
+    def status_field(status: str) -> str:
+        return f"{status.lower()}_count"
+
+
+class DailyItemRollup(models.Model):
+    date               = models.DateField(verbose_name="Sana")
+    item_name_snapshot = models.CharField(max_length=120, verbose_name="Nomi")
+    qty                = models.IntegerField(default=0, verbose_name="Soni")
+    amount             = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"), verbose_name="Summa")
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "item_name_snapshot"], name="uniq_item_rollup_per_day"),
+        ]
+        ordering            = ["-date", "-qty"]
+        verbose_name        = "Kunlik mahsulot jamlanmasi"
+        verbose_name_plural = "Kunlik mahsulot jamlanmalari"
+
+    def __str__(self) -> str:
+        return f"{self.date}: {self.item_name_snapshot} × {self.qty}"
@@ -0,0 +1,209 @@
+"""
+Kunlik jamlanmalar (DailySalesRollup / DailyItemRollup) bilan ishlash.
+
+- add_* funksiyalar signal'lardan chaqiriladi va atomik delta qo'shadi (F() UPDATE yoki
+  mahsulotlar uchun bitta INSERT ... ON CONFLICT);
+- compute_day / rebuild_day xom jadvallardan kunni qayta hisoblaydi (backfill, verify);
+- summarize hisobot view'lari uchun [date_from, date_to] bo'yicha O(kunlar) natija beradi.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from config.dates import date_window
+from expenses.models import Expense
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from .models import DailySalesRollup, DailyItemRollup
+
+STATUS_FIELDS = {status: DailySalesRollup.status_field(status) for status in Order.Status.values}
+
+
+def _upsert(model, lookup, deltas):
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    # F() UPDATE auto_now'ni o'rnatmaydi — hisobot kesh digest'i (reports.cache) updated_at'ga tayanadi
+    updates = {k: F(k) + v for k, v in deltas.items()}
+    updates["updated_at"] = timezone.now()
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # parallel so'rov qatorni birinchi bo'lib yaratdi
+        model.objects.filter(**lookup).update(**updates)
+
+
+# ── Delta'lar (sign=1 qo'shish, sign=-1 ayirish) ──
+def add_payment(paid_at, amount, is_debt, sign=1):
+    if is_debt or paid_at is None:
+        return
+    _upsert(DailySalesRollup, {"date": timezone.localdate(paid_at)}, {"revenue": sign * Decimal(amount)})
+
+
+def add_expense(spent_at, amount, sign=1):
+    if spent_at is None:
+        return
+    _upsert(DailySalesRollup, {"date": timezone.localdate(spent_at)}, {"expense": sign * Decimal(amount)})
+
+
+def add_order(created_at, status, sign=1):
+    if created_at is None:
+        return
+    add_status_counts(timezone.localdate(created_at), {status: sign})
+
+
+def add_status_counts(day, counts):
+    """counts: {status: delta} — bitta kun uchun bitta UPDATE."""
+    _upsert(DailySalesRollup, {"date": day}, {STATUS_FIELDS[status]: delta for status, delta in counts.items()})
+
+
+def add_item(created_at, item_name_snapshot, qty, line_total, sign=1):
+    if created_at is None:
+        return
+    add_item_for_day(timezone.localdate(created_at), item_name_snapshot, sign * qty, sign * Decimal(line_total))
+
+
+def add_item_for_day(day, item_name_snapshot, qty, amount):
+    add_items([(day, item_name_snapshot, qty, amount)])
+
+
+def add_items(rows):
+    """
+    rows: [(kun, nom, qty, summa)] — bitta INSERT ... ON CONFLICT DO UPDATE bilan (SQLite 3.24+,
+    PostgreSQL). Bir xil (kun, nom) qatorlar oldindan qo'shiladi: bitta statement ichida bitta
+    kalit ikki marta kelsa PostgreSQL xato beradi.
+    """
+    grouped = {}
+    for day, name, qty, amount in rows:
+        old_qty, old_amount = grouped.get((day, name), (0, Decimal("0.00")))
+        grouped[(day, name)] = (old_qty + qty, old_amount + Decimal(amount))
+    grouped = {key: value for key, value in grouped.items() if any(value)}
+    if not grouped:
+        return
+
+    meta = DailyItemRollup._meta
+    columns = ("date", "item_name_snapshot", "qty", "amount", "updated_at")
+    fields = [meta.get_field(name) for name in columns]
+    now = timezone.now()
+    params = []
+    for (day, name), (qty, amount) in grouped.items():
+        params += [f.get_db_prep_save(v, connection) for f, v in zip(fields, (day, name, qty, amount, now))]
+
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    placeholders = ", ".join(["(%s)" % ", ".join(["%s"] * len(columns))] * len(grouped))
+    sql = (
+        f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) VALUES {placeholders} "
+        f"ON CONFLICT ({qn('date')}, {qn('item_name_snapshot')}) DO UPDATE SET "
+        f"{qn('qty')} = {table}.{qn('qty')} + EXCLUDED.{qn('qty')}, "
+        f"{qn('amount')} = {table}.{qn('amount')} + EXCLUDED.{qn('amount')}, "
+        f"{qn('updated_at')} = EXCLUDED.{qn('updated_at')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+# ── Xom jadvallardan qayta hisoblash ──
+def compute_day(day):
+    """Bitta kun uchun jamlanmani xom jadvallardan hisoblaydi (saqlamaydi)."""
+    start, end = date_window(day, day)
+
+    sales = {
+        "revenue": Payment.objects.filter(
+            is_debt=False, paid_at__gte=start, paid_at__lt=end
+        ).aggregate(s=Sum("amount"))["s"] or Decimal("0.00"),
+        "expense": Expense.objects.filter(
+            spent_at__gte=start, spent_at__lt=end
+        ).aggregate(s=Sum("amount"))["s"] or Decimal("0.00"),
+    }
+    sales.update(
+        Order.objects.filter(created_at__gte=start, created_at__lt=end).aggregate(
+            **{field: Count("id", filter=Q(status=status)) for status, field in STATUS_FIELDS.items()}
+        )
+    )
+
+    items = {
+        name: (qty, amount)
+        for name, qty, amount in (
+            OrderItem.objects.filter(created_at__gte=start, created_at__lt=end)
+            .order_by()
+            .values_list("item_name_snapshot")
+            .annotate(qty=Sum("qty"), amount=Sum("line_total"))
+        )
+    }
+    return sales, items
+
+
+def stored_day(day):
+    """Bazadagi jamlanma — compute_day bilan bir xil ko'rinishda."""
+    row = DailySalesRollup.objects.filter(date=day).values("revenue", "expense", *STATUS_FIELDS.values()).first()
+    if row is None:
+        row = {"revenue": Decimal("0.00"), "expense": Decimal("0.00")}
+        row.update({field: 0 for field in STATUS_FIELDS.values()})
+    items = {
+        name: (qty, amount)
+        for name, qty, amount in DailyItemRollup.objects.filter(date=day).values_list(
+            "item_name_snapshot", "qty", "amount"
+        )
+        if qty or amount
+    }
+    return row, items
+
+
+@transaction.atomic
+def rebuild_day(day):
+    sales, items = compute_day(day)
+    if any(sales.values()):
+        DailySalesRollup.objects.update_or_create(date=day, defaults=sales)
+    else:
+        DailySalesRollup.objects.filter(date=day).delete()
+
+    DailyItemRollup.objects.filter(date=day).delete()
+    DailyItemRollup.objects.bulk_create([
+        DailyItemRollup(date=day, item_name_snapshot=name, qty=qty, amount=amount)
+        for name, (qty, amount) in items.items()
+    ])
+
+
+def iter_days(date_from, date_to):
+    day = date_from
+    while day <= date_to:
+        yield day
+        day += timedelta(days=1)
+
+
+# ── Hisobotlar uchun ──
+def summarize(date_from, date_to, top_n):
+    totals = DailySalesRollup.objects.filter(date__gte=date_from, date__lte=date_to).aggregate(
+        revenue=Sum("revenue"),
+        expense=Sum("expense"),
+        **{field: Sum(field) for field in STATUS_FIELDS.values()},
+    )
+    revenue = totals["revenue"] or 0
+    expense = totals["expense"] or 0
+
+    top_items = (
+        DailyItemRollup.objects.filter(date__gte=date_from, date__lte=date_to)
+        .values("item_name_snapshot")
+        .annotate(qty=Sum("qty"), amount=Sum("amount"))
+        .filter(qty__gt=0)
+        .order_by("-qty")[:top_n]
+    )
+
+    return {
+        "revenue": revenue,
+        "expense": expense,
+        "profit": revenue - expense,
+        "top_items": list(top_items),
+        "orders_by_status": [
+            {"status": status, "count": totals[field]}
+            for status, field in STATUS_FIELDS.items()
+            if totals[field]
+        ],
+    }
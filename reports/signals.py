@@ -0,0 +1,141 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from expenses.models import Expense
+from orders.models import Order, OrderItem
+from orders.signals import order_items_bulk_created, order_status_bulk_changed
+from payments.models import Payment
+from . import rollup
+
+# Yangilanishda eski qiymatni ayirib, yangisini qo'shamiz (-old +new).
+# Eski qiymat pre_save da instance._rollup_old ga olinadi (faqat mavjud qator uchun).
+
+
+def _old_values(model, instance, fields):
+    if instance.pk is None:
+        return None
+    return model.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+# ── Payment ──
+PAYMENT_FIELDS = ("paid_at", "amount", "is_debt")
+
+
+@receiver(pre_save, sender=Payment)
+def payment_pre_save(sender, instance, raw=False, **kwargs):
+    instance._rollup_old = None if raw else _old_values(Payment, instance, PAYMENT_FIELDS)
+
+
+@receiver(post_save, sender=Payment)
+def payment_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, "_rollup_old", None)
+    if old:
+        rollup.add_payment(**old, sign=-1)
+    rollup.add_payment(instance.paid_at, instance.amount, instance.is_debt)
+
+
+@receiver(post_delete, sender=Payment)
+def payment_post_delete(sender, instance, **kwargs):
+    rollup.add_payment(instance.paid_at, instance.amount, instance.is_debt, sign=-1)
+
+
+# ── Expense ──
+EXPENSE_FIELDS = ("spent_at", "amount")
+
+
+@receiver(pre_save, sender=Expense)
+def expense_pre_save(sender, instance, raw=False, **kwargs):
+    instance._rollup_old = None if raw else _old_values(Expense, instance, EXPENSE_FIELDS)
+
+
+@receiver(post_save, sender=Expense)
+def expense_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, "_rollup_old", None)
+    if old:
+        rollup.add_expense(**old, sign=-1)
+    rollup.add_expense(instance.spent_at, instance.amount)
+
+
+@receiver(post_delete, sender=Expense)
+def expense_post_delete(sender, instance, **kwargs):
+    rollup.add_expense(instance.spent_at, instance.amount, sign=-1)
+
+
+# ── OrderItem ──
+ITEM_FIELDS = ("created_at", "item_name_snapshot", "qty", "line_total")
+
+
+@receiver(pre_save, sender=OrderItem)
+def item_pre_save(sender, instance, raw=False, **kwargs):
+    instance._rollup_old = None if raw else _old_values(OrderItem, instance, ITEM_FIELDS)
+
+
+@receiver(post_save, sender=OrderItem)
+def item_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, "_rollup_old", None)
+    if old:
+        rollup.add_item(**old, sign=-1)
+    rollup.add_item(instance.created_at, instance.item_name_snapshot, instance.qty, instance.line_total)
+
+
+@receiver(post_delete, sender=OrderItem)
+def item_post_delete(sender, instance, **kwargs):
+    rollup.add_item(instance.created_at, instance.item_name_snapshot, instance.qty, instance.line_total, sign=-1)
+
+
+@receiver(order_items_bulk_created, sender=OrderItem)
+def items_bulk_created(sender, items, **kwargs):
+    # butun partiya — bitta upsert statement
+    rollup.add_items([
+        (timezone.localdate(item.created_at), item.item_name_snapshot, item.qty, item.line_total)
+        for item in items
+    ])
+
+
+# ── Order (status bo'yicha sanoq) ──
+@receiver(pre_save, sender=Order)
+def order_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or (update_fields is not None and "status" not in update_fields):
+        instance._rollup_old_status = None
+        return
+    # Order o'zi yuklangan qiymatlarni eslab qoladi — qo'shimcha SELECT yo'q
+    instance._rollup_old_status = instance.loaded_value("status")
+
+
+@receiver(post_save, sender=Order)
+def order_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_status = getattr(instance, "_rollup_old_status", None)
+    if created:
+        rollup.add_order(instance.created_at, instance.status)
+    elif old_status and old_status != instance.status:
+        # created_at o'zgarmaydi (auto_now_add)
+        rollup.add_order(instance.created_at, old_status, sign=-1)
+        rollup.add_order(instance.created_at, instance.status)
+
+
+@receiver(order_status_bulk_changed, sender=Order)
+def orders_bulk_status_changed(sender, changes, **kwargs):
+    # kun bo'yicha guruhlab — har bir kunga bitta UPDATE
+    by_day = {}
+    for order, from_status in changes:
+        if from_status == order.status:
+            continue
+        counts = by_day.setdefault(timezone.localdate(order.created_at), {})
+        counts[from_status] = counts.get(from_status, 0) - 1
+        counts[order.status] = counts.get(order.status, 0) + 1
+    for day, counts in by_day.items():
+        rollup.add_status_counts(day, counts)
+
+
+@receiver(post_delete, sender=Order)
+def order_post_delete(sender, instance, **kwargs):
+    rollup.add_order(instance.created_at, instance.status, sign=-1)
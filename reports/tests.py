@@ -0,0 +1,366 @@
+import base64
+import importlib
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import User
+from config.dates import date_window, day_start
+from config.pagination import KeysetPagination
+from expenses.models import Expense, ExpenseCategory
+from expenses.views import ExpenseViewSet
+from menu.models import Category, MenuItem
+from orders.models import Order, OrderItem
+from orders.views import OrderViewSet
+from payments.models import Payment
+from payments.views import PaymentViewSet
+from tables.models import Table
+from . import analytics
+from .models import DailySalesRollup, DailyItemRollup
+
+
+class QueryPlanTests(TestCase):
+	"""
+	Har bir issiq filter EXPLAIN orqali tekshiriladi: jadvalni to'liq skanerlasa — xato.
+	SQLite: "SCAN <jadval>" (USING INDEX bo'lsa ham — bu butun indeksni o'qish);
+	PostgreSQL: "Seq Scan" (enable_seqscan=off bilan).
+	"""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.manager = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		cls.waiter = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		cls.start, cls.end = date_window(date(2026, 3, 1), date(2026, 3, 31))
+
+	def setUp(self):
+		if connection.vendor == "postgresql":
+			with connection.cursor() as cursor:
+				cursor.execute("SET LOCAL enable_seqscan TO off")
+		elif connection.vendor != "sqlite":
+			self.skipTest("EXPLAIN tekshiruvi faqat SQLite/PostgreSQL uchun.")
+
+	def assertUsesIndex(self, qs):
+		plan = qs.explain()
+		table = qs.model._meta.db_table
+		if connection.vendor == "postgresql":
+			full_scan = f"Seq Scan on {table}" in plan
+		else:
+			full_scan = re.search(rf"\bSCAN {table}\b", plan) is not None
+		self.assertFalse(full_scan, f"{table} to'liq skanerlanmoqda:\n{plan}")
+
+	# ── OrderViewSet.get_queryset ──
+	def _order_list_qs(self, user, **params):
+		view = OrderViewSet()
+		view.action = "list"
+		view.format_kwarg = None
+		view.request = Request(APIRequestFactory().get("/api/orders/", params))
+		view.request.user = user
+		return view.get_queryset()
+
+	def test_order_list_status_filter(self):
+		self.assertUsesIndex(self._order_list_qs(self.manager, status=Order.Status.NEW))
+
+	def test_order_list_table_filter(self):
+		self.assertUsesIndex(self._order_list_qs(self.manager, table=1))
+
+	def test_order_list_waiter_scope(self):
+		self.assertUsesIndex(self._order_list_qs(self.waiter))
+
+	def test_order_list_date_filter(self):
+		self.assertUsesIndex(self._order_list_qs(self.manager, date_from="2026-03-01", date_to="2026-03-31"))
+
+	# ── KeysetPagination: (-vaqt, -id) tartibi indeksdan, alohida saralashsiz ──
+	def assertOrderedByIndex(self, qs):
+		plan = qs.explain()
+		if connection.vendor == "postgresql":
+			sorted_ = re.search(r"(?<!Incremental )\bSort\b", plan) is not None
+		else:
+			sorted_ = "USE TEMP B-TREE FOR ORDER BY" in plan
+		self.assertFalse(sorted_, f"{qs.model._meta.db_table} keyset tartibi indeksdan emas:\n{plan}")
+
+	def _keyset_qs(self, viewset, **params):
+		view = viewset()
+		view.action = "list"
+		view.format_kwarg = None
+		view.request = Request(APIRequestFactory().get("/", params))
+		view.request.user = self.manager
+		qs = view.filter_queryset(view.get_queryset())
+		return KeysetPagination().keyset_queryset(qs, view.request, view)[:21]
+
+	def test_keyset_ordering_uses_index(self):
+		cursor = base64.urlsafe_b64encode(b"2026-03-15T00:00:00+05:00|100").decode()
+		for viewset in (OrderViewSet, PaymentViewSet, ExpenseViewSet):
+			with self.subTest(viewset=viewset.__name__):
+				self.assertOrderedByIndex(self._keyset_qs(viewset))
+				self.assertOrderedByIndex(self._keyset_qs(viewset, cursor=cursor))
+
+	# ── DailyReportView / RangeReportView (rollup jadvallari) ──
+	def test_report_rollup_range(self):
+		self.assertUsesIndex(DailySalesRollup.objects.filter(date__gte=date(2026, 3, 1), date__lte=date(2026, 3, 31)))
+		self.assertUsesIndex(DailyItemRollup.objects.filter(date__gte=date(2026, 3, 1), date__lte=date(2026, 3, 31)))
+
+	# ── rollup.compute_day (backfill / verify) ──
+	def test_report_revenue(self):
+		if connection.vendor == "sqlite":
+			# SQLite is_debt=False ni "NOT is_debt" deb yozadi va (is_debt, paid_at) indeksiga moslay olmaydi
+			self.skipTest("SQLite boolean ustunli indeksni NOT bilan ishlatmaydi.")
+		self.assertUsesIndex(Payment.objects.filter(is_debt=False, paid_at__gte=self.start, paid_at__lt=self.end))
+
+	def test_report_expense(self):
+		self.assertUsesIndex(Expense.objects.filter(spent_at__gte=self.start, spent_at__lt=self.end))
+
+	def test_report_top_items(self):
+		self.assertUsesIndex(OrderItem.objects.filter(created_at__gte=self.start, created_at__lt=self.end))
+
+	def test_report_orders_by_status(self):
+		self.assertUsesIndex(Order.objects.filter(created_at__gte=self.start, created_at__lt=self.end))
+
+	# ── WaiterStatsView ──
+	def test_waiter_stats_orders(self):
+		self.assertUsesIndex(Order.objects.filter(created_by=self.waiter, created_at__gte=self.start, created_at__lt=self.end))
+
+	def test_waiter_stats_payments(self):
+		self.assertUsesIndex(Payment.objects.filter(received_by=self.waiter, paid_at__gte=self.start, paid_at__lt=self.end))
+
+
+class DateWindowTests(TestCase):
+	def test_half_open_window_in_cafe_timezone(self):
+		start, end = date_window(date(2026, 3, 1), date(2026, 3, 2))
+		self.assertEqual(start.isoformat(), "2026-03-01T00:00:00+05:00")
+		self.assertEqual(end.isoformat(), "2026-03-03T00:00:00+05:00")
+		self.assertEqual(date_window(None, None), (None, None))
+
+
+class SalesRollupTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		self.table = Table.objects.create(number=1)
+		cat = Category.objects.create(name="Drinks")
+		self.tea = MenuItem.objects.create(category=cat, name="Tea", price=Decimal("1.50"))
+		self.coffee = MenuItem.objects.create(category=cat, name="Coffee", price=Decimal("2.00"))
+		self.today = timezone.localdate()
+
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.table, created_by=self.user)
+		OrderItem.bulk_add(order, [{"menu_item_id": self.tea.id, "qty": 2}, {"menu_item_id": self.coffee.id, "qty": 1}])
+		item = OrderItem.objects.create(order=order, menu_item=self.tea, qty=1)
+		item.qty = 4
+		item.save()
+		for status in (Order.Status.COOKING, Order.Status.READY, Order.Status.SERVED):
+			order.change_status(to_status=status, by_user=self.user)
+		Payment.objects.create(order=order, received_by=self.user, method=Payment.Method.CASH, amount=Decimal("5.00"))
+		Payment.objects.create(order=order, received_by=self.user, method=Payment.Method.CARD, amount=Decimal("3.00")).delete()
+		Order.objects.create(order_type=Order.OrderType.TAKEAWAY, customer_name="Ali", created_by=self.user)
+		Expense.objects.create(
+			category=ExpenseCategory.objects.create(name="Gaz"), created_by=self.user,
+			amount=Decimal("4.00"), spent_at=timezone.now(),
+		)
+
+	def test_incremental_rollup_matches_raw_data(self):
+		call_command("rebuild_sales_rollup", "--verify", stdout=open("/dev/null", "w"))
+		row = DailySalesRollup.objects.get(date=self.today)
+		self.assertEqual(row.revenue, Decimal("5.00"))
+		self.assertEqual(row.expense, Decimal("4.00"))
+		self.assertEqual((row.new_count, row.served_count), (1, 1))
+		self.assertEqual(DailyItemRollup.objects.get(date=self.today, item_name_snapshot="Tea").qty, 6)
+
+	def test_rebuild_restores_rollup(self):
+		DailySalesRollup.objects.all().delete()
+		DailyItemRollup.objects.all().delete()
+		call_command("rebuild_sales_rollup", stdout=open("/dev/null", "w"))
+		call_command("rebuild_sales_rollup", "--verify", stdout=open("/dev/null", "w"))
+
+	def test_migration_backfills_existing_data(self):
+		DailySalesRollup.objects.all().delete()
+		DailyItemRollup.objects.all().delete()
+		migration = importlib.import_module("reports.migrations.0002_backfill_daily_rollups")
+		migration.backfill_daily_rollups(apps, None)
+		call_command("rebuild_sales_rollup", "--verify", stdout=open("/dev/null", "w"))
+		self.assertEqual(DailySalesRollup.objects.get(date=self.today).revenue, Decimal("5.00"))
+
+	def test_daily_report_reads_rollup(self):
+		client = APIClient()
+		client.force_authenticate(self.user)
+		r = client.get(f"/api/reports/daily/?date={self.today}")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(r.data["revenue"], Decimal("5.00"))
+		self.assertEqual(r.data["profit"], Decimal("1.00"))
+		self.assertEqual(r.data["top_items"][0], {"item_name_snapshot": "Tea", "qty": 6, "amount": Decimal("9.00")})
+		self.assertCountEqual(r.data["orders_by_status"], [{"status": "NEW", "count": 1}, {"status": "SERVED", "count": 1}])
+
+
+class ReportQueryCountTests(TestCase):
+	"""Har bir hisobot endpoint'i uchun so'rovlar soni (force_authenticate — auth so'rovsiz)."""
+
+	def setUp(self):
+		cache.clear()
+		self.manager = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		self.waiter = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		table = Table.objects.create(number=1)
+		tea = MenuItem.objects.create(category=Category.objects.create(name="Drinks"), name="Tea", price=Decimal("1.50"))
+		for _ in range(3):
+			order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=table, created_by=self.waiter)
+			OrderItem.objects.create(order=order, menu_item=tea, qty=2)
+		self.client = APIClient()
+		self.client.force_authenticate(self.manager)
+		self.today = timezone.localdate()
+
+	def assertQueries(self, url, expected):
+		with self.assertNumQueries(expected):
+			r = self.client.get(url)
+		self.assertEqual(r.status_code, 200, r.data)
+		return r
+
+	# +2 — kesh digest'i (DailySalesRollup + DailyItemRollup aggregate)
+	def test_daily_report(self):
+		self.assertQueries(f"/api/reports/daily/?date={self.today}", 4)
+
+	def test_range_report(self):
+		self.assertQueries(f"/api/reports/range/?date_from=2026-01-01&date_to={self.today}", 4)
+
+	def test_waiter_stats(self):
+		r = self.assertQueries(f"/api/reports/waiter-stats/?user_id={self.waiter.id}&date_from=2026-01-01", 3)
+		self.assertEqual(r.data["total_orders"], 3)
+		self.assertEqual(r.data["by_status"], [{"status": "NEW", "count": 3}])
+
+	def test_my_stats(self):
+		self.client.force_authenticate(self.waiter)
+		r = self.assertQueries("/api/orders/my-stats/", 1)
+		self.assertEqual(r.data["total_orders"], 3)
+
+
+class ReportCacheTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.manager = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		self.client = APIClient()
+		self.client.force_authenticate(self.manager)
+		self.category = ExpenseCategory.objects.create(name="Gaz")
+		self.past = timezone.now() - timedelta(days=10)
+		self.url = f"/api/reports/daily/?date={timezone.localdate(self.past)}"
+
+	def _expense(self, when):
+		return Expense.objects.create(category=self.category, created_by=self.manager, amount=Decimal("4.00"), spent_at=when)
+
+	def test_hit_after_miss_and_precise_invalidation(self):
+		self._expense(self.past)
+		self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+		with self.assertNumQueries(2):  # faqat digest
+			r = self.client.get(self.url)
+		self.assertEqual(r["X-Cache"], "HIT")
+		self.assertEqual(r.data["expense"], Decimal("4.00"))
+
+		# boshqa kunga yozuv — bu kesh yozuviga tegmaydi
+		self._expense(timezone.now())
+		self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+		# shu kunga yozuv — kesh eskiradi
+		self._expense(self.past)
+		r = self.client.get(self.url)
+		self.assertEqual(r["X-Cache"], "MISS")
+		self.assertEqual(r.data["expense"], Decimal("8.00"))
+
+		self.assertEqual(self.client.get("/api/reports/cache-stats/").data, {"hits": 2, "misses": 2})
+
+	def test_digest_follows_database_not_local_state(self):
+		self._expense(self.past)
+		self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+		# boshqa worker'dagi yozuv: bu jarayonda signal/kesh yangilanishi yo'q
+		DailySalesRollup.objects.filter(date=timezone.localdate(self.past)).update(
+			expense=Decimal("9.00"), updated_at=timezone.now(),
+		)
+		r = self.client.get(self.url)
+		self.assertEqual(r["X-Cache"], "MISS")
+		self.assertEqual(r.data["expense"], Decimal("9.00"))
+
+	def test_range_bounds(self):
+		url = "/api/reports/range/?date_from={}&date_to={}"
+		self.assertEqual(self.client.get(url.format("2026-03-08", "2026-03-02")).status_code, 400)
+		self.assertEqual(self.client.get(url.format("2024-01-01", "2025-01-01")).status_code, 400)
+		r = self.client.get(url.format("2025-01-01", "2025-12-31"))
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(r["X-Cache"], "MISS")
+
+
+class SalesAnalyticsTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.manager = User.objects.create_user(username="manager", password="pass", role=User.Role.MANAGER)
+		cat = Category.objects.create(name="Drinks")
+		tea = MenuItem.objects.create(category=cat, name="Tea", price=Decimal("1.50"))
+		coffee = MenuItem.objects.create(category=cat, name="Coffee", price=Decimal("2.00"))
+		cake = MenuItem.objects.create(category=cat, name="Cake", price=Decimal("4.00"))
+		monday = date(2026, 3, 2)
+
+		def order(day, hour, minute, lines, status=None):
+			o = Order.objects.create(order_type=Order.OrderType.TAKEAWAY, customer_name="Ali", created_by=self.manager)
+			OrderItem.bulk_add(o, [{"menu_item_id": item.id, "qty": qty} for item, qty in lines])
+			if status:
+				o.change_status(to_status=status, by_user=self.manager)
+			at = day_start(day) + timedelta(hours=hour, minutes=minute)
+			Order.objects.filter(pk=o.pk).update(created_at=at)
+			return o, at
+
+		first, at = order(monday, 9, 30, [(tea, 2), (coffee, 1)])
+		order(monday, 9, 45, [(tea, 1), (coffee, 1), (cake, 1)])
+		order(monday + timedelta(days=1), 18, 0, [(tea, 1)])
+		order(monday, 9, 50, [(tea, 1), (coffee, 1)], status=Order.Status.CANCELED)
+		payment = Payment.objects.create(order=first, received_by=self.manager, method=Payment.Method.CASH, amount=Decimal("5.00"))
+		Payment.objects.filter(pk=payment.pk).update(paid_at=at + timedelta(minutes=30))
+
+		self.client = APIClient()
+		self.client.force_authenticate(self.manager)
+		self.query = "?date_from=2026-03-02&date_to=2026-03-08"
+
+	def get(self, name):
+		r = self.client.get(f"/api/reports/analytics/{name}/{self.query}")
+		self.assertEqual(r.status_code, 200)
+		return r
+
+	def test_heatmap_and_weekday_pattern(self):
+		data = self.get("heatmap").data
+		self.assertEqual(data["orders"][0][9], 2)  # bekor qilingan hisobga olinmaydi
+		self.assertEqual(data["orders"][1][18], 1)
+		self.assertEqual(sum(map(sum, data["orders"])), 3)
+		self.assertEqual(data["revenue"][0][10], Decimal("5.00"))
+
+		monday, tuesday = self.get("weekday").data["weekdays"][:2]
+		self.assertEqual((monday["days"], monday["orders"], monday["peak_hour"]), (1, 2, 9))
+		self.assertEqual(monday["avg_revenue"], Decimal("5.00"))
+		self.assertEqual(tuesday["peak_hour"], 18)
+
+	def test_heatmap_group_by_in_db_matches_python_path(self):
+		# PostgreSQL yo'li (ExtractIsoWeekDay/ExtractHour + GROUP BY) SQLite'da ham ishlaydi — natija bir xil
+		python = analytics.heatmap(date(2026, 3, 2), date(2026, 3, 8))
+		with mock.patch.object(analytics, "_group_in_db", return_value=True), self.assertNumQueries(2):
+			grouped = analytics.heatmap(date(2026, 3, 2), date(2026, 3, 8))
+		self.assertEqual(grouped, python)
+
+	def test_basket_sizes_and_co_occurrence(self):
+		data = self.get("basket-sizes").data
+		self.assertEqual(data["distribution"], [{"size": 1, "orders": 1}, {"size": 3, "orders": 2}])
+		self.assertEqual((data["orders"], data["mean"], data["p50"]), (3, 2.33, 3))
+
+		data = self.get("co-occurrence").data
+		self.assertEqual(data["pairs"][0], {"items": ["Coffee", "Tea"], "orders": 2, "share": 0.6667})
+		self.assertEqual(len(data["pairs"]), 3)
+
+	def test_cached_per_range_and_manager_only(self):
+		self.assertEqual(self.get("co-occurrence")["X-Cache"], "MISS")
+		with self.assertNumQueries(2):  # faqat digest
+			self.assertEqual(self.get("co-occurrence")["X-Cache"], "HIT")
+		self.assertEqual(self.client.get("/api/reports/analytics/heatmap/?date_from=2026-03-08&date_to=2026-03-02").status_code, 400)
+
+		waiter = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		self.client.force_authenticate(waiter)
+		self.assertEqual(self.client.get(f"/api/reports/analytics/heatmap/{self.query}").status_code, 403)
@@ -1,17 +1,38 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
 from django.utils.dateparse import parse_date
-from django.db.models import Sum, Count
+from django.db.models import Sum
 
 from accounts.permissions import IsManager, _role
+from config.dates import filter_date_window
 from payments.models import Payment
-from expenses.models import Expense
-from orders.models import Order, OrderItem
+from orders.models import Order, order_stats
+from . import analytics
+from . import cache as report_cache
+from . import rollup
+
+
+def _date_range(request):
+    """(date_from, date_to, None) yoki xato bo'lsa (None, None, 400 Response)."""
+    df = parse_date(request.query_params.get("date_from", ""))
+    dt = parse_date(request.query_params.get("date_to", ""))
+    if not df or not dt:
+        detail = "date_from va date_to majburiy."
+    elif df > dt:
+        detail = "date_from date_to dan keyin bo'lmasligi kerak."
+    elif (dt - df).days >= settings.REPORT_MAX_RANGE_DAYS:
+        detail = f"Davr {settings.REPORT_MAX_RANGE_DAYS} kundan oshmasligi kerak."
+    else:
+        return df, dt, None
+    return None, None, Response({"detail": detail}, status=400)
 
 
 class DailyReportView(APIView):
-    """Kunlik hisobot — faqat MANAGER."""
+    """Kunlik hisobot — faqat MANAGER. DailySalesRollup dan o'qiladi."""
     permission_classes = [IsAuthenticated, IsManager]
 
     def get(self, request):
@@ -20,75 +41,26 @@ class DailyReportView(APIView):
         if not d:
             return Response({"detail": "date=YYYY-MM-DD majburiy."}, status=400)
 
-        revenue = Payment.objects.filter(is_debt=False, paid_at__date=d).aggregate(s=Sum("amount"))["s"] or 0
-        expense = Expense.objects.filter(spent_at__date=d).aggregate(s=Sum("amount"))["s"] or 0
-        profit  = revenue - expense
-
-        top_items = (
-            OrderItem.objects.filter(created_at__date=d)
-            .values("item_name_snapshot")
-            .annotate(qty=Sum("qty"), amount=Sum("line_total"))
-            .order_by("-qty")[:10]
-        )
-
-        orders_by_status = (
-            Order.objects.filter(created_at__date=d)
-            .values("status")
-            .annotate(count=Count("id"))
+        data, hit = report_cache.cached_report(
+            "daily", d, d, lambda: {"date": str(d), **rollup.summarize(d, d, top_n=10)}
         )
-
-        return Response({
-            "date": str(d),
-            "revenue": revenue,
-            "expense": expense,
-            "profit": profit,
-            "top_items": list(top_items),
-            "orders_by_status": list(orders_by_status),
-        })
+        return Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
 
 
 class RangeReportView(APIView):
-    """Davr bo'yicha hisobot — faqat MANAGER."""
+    """Davr bo'yicha hisobot — faqat MANAGER. Narxi O(kunlar), O(qatorlar) emas."""
     permission_classes = [IsAuthenticated, IsManager]
 
     def get(self, request):
-        df = parse_date(request.query_params.get("date_from", ""))
-        dt = parse_date(request.query_params.get("date_to", ""))
-        if not df or not dt:
-            return Response({"detail": "date_from va date_to majburiy."}, status=400)
-
-        revenue = Payment.objects.filter(
-            is_debt=False, paid_at__date__gte=df, paid_at__date__lte=dt
-        ).aggregate(s=Sum("amount"))["s"] or 0
-
-        expense = Expense.objects.filter(
-            spent_at__date__gte=df, spent_at__date__lte=dt
-        ).aggregate(s=Sum("amount"))["s"] or 0
+        df, dt, error = _date_range(request)
+        if error:
+            return error
 
-        profit = revenue - expense
-
-        top_items = (
-            OrderItem.objects.filter(created_at__date__gte=df, created_at__date__lte=dt)
-            .values("item_name_snapshot")
-            .annotate(qty=Sum("qty"), amount=Sum("line_total"))
-            .order_by("-qty")[:20]
-        )
-
-        orders_by_status = (
-            Order.objects.filter(created_at__date__gte=df, created_at__date__lte=dt)
-            .values("status")
-            .annotate(count=Count("id"))
+        data, hit = report_cache.cached_report(
+            "range", df, dt,
+            lambda: {"date_from": str(df), "date_to": str(dt), **rollup.summarize(df, dt, top_n=20)},
         )
-
-        return Response({
-            "date_from": str(df),
-            "date_to": str(dt),
-            "revenue": revenue,
-            "expense": expense,
-            "profit": profit,
-            "top_items": list(top_items),
-            "orders_by_status": list(orders_by_status),
-        })
+        return Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
 
 
 class WaiterStatsView(APIView):
@@ -114,28 +86,77 @@ class WaiterStatsView(APIView):
         df = parse_date(request.query_params.get("date_from", ""))
         dt = parse_date(request.query_params.get("date_to", ""))
 
-        qs = Order.objects.filter(created_by=target_user)
-        if df:
-            qs = qs.filter(created_at__date__gte=df)
-        if dt:
-            qs = qs.filter(created_at__date__lte=dt)
-
-        total_orders     = qs.count()
-        by_status        = list(qs.values("status").annotate(count=Count("id")))
-        total_revenue    = qs.filter(status=Order.Status.PAID).aggregate(s=Sum("total"))["s"] or 0
-        payments_received = Payment.objects.filter(received_by=target_user)
-        if df:
-            payments_received = payments_received.filter(paid_at__date__gte=df)
-        if dt:
-            payments_received = payments_received.filter(paid_at__date__lte=dt)
+        qs = filter_date_window(Order.objects.filter(created_by=target_user), "created_at", df, dt)
+
+        stats = order_stats(qs)
+        payments_received = filter_date_window(
+            Payment.objects.filter(received_by=target_user), "paid_at", df, dt
+        )
 
         total_payments = payments_received.aggregate(s=Sum("amount"))["s"] or 0
 
         return Response({
             "user": target_user.username,
             "role": target_user.role,
-            "total_orders": total_orders,
-            "by_status": by_status,
-            "total_revenue_paid_orders": total_revenue,
+            "total_orders": stats["total_orders"],
+            "by_status": stats["by_status"],
+            "total_revenue_paid_orders": stats["total_revenue_paid"],
             "total_payments_received": total_payments,
         })
+
+
+class ReportCacheStatsView(APIView):
+    """Hisobot keshi hit/miss hisoblagichlari — faqat MANAGER."""
+    permission_classes = [IsAuthenticated, IsManager]
+
+    def get(self, request):
+        return Response(report_cache.stats())
+
+
+class _AnalyticsView(APIView):
+    """reports.analytics hisobotlari — faqat MANAGER, davr bo'yicha keshlanadi."""
+    permission_classes = [IsAuthenticated, IsManager]
+    name = None
+    build = None
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("date_from", OpenApiTypes.DATE, required=True),
+            OpenApiParameter("date_to", OpenApiTypes.DATE, required=True),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def get(self, request):
+        df, dt, error = _date_range(request)
+        if error:
+            return error
+
+        data, hit = report_cache.cached_report(
+            f"analytics-{self.name}", df, dt,
+            lambda: {"date_from": str(df), "date_to": str(dt), **self.build(df, dt)},
+        )
+        return Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+class HeatmapView(_AnalyticsView):
+    """Buyurtmalar soni va tushum: hafta kuni × soat."""
+    name = "heatmap"
+    build = staticmethod(analytics.heatmap)
+
+
+class WeekdayPatternView(_AnalyticsView):
+    """Hafta kunlari bo'yicha jami, kunlik o'rtacha va eng gavjum soat."""
+    name = "weekday"
+    build = staticmethod(analytics.weekday_pattern)
+
+
+class BasketSizeView(_AnalyticsView):
+    """Buyurtmadagi mahsulotlar soni taqsimoti (o'rtacha, p50, p90)."""
+    name = "basket-sizes"
+    build = staticmethod(analytics.basket_sizes)
+
+
+class CoOccurrenceView(_AnalyticsView):
+    """Bitta buyurtmada eng ko'p birga olinadigan mahsulot juftliklari."""
+    name = "co-occurrence"
+    build = staticmethod(analytics.co_occurrence)
@@ -2,7 +2,6 @@ from django.contrib import admin
 from django.utils.html import format_html
 
 from accounts.permissions import _role
-from orders.models import Order
 from .models import Table
 
 
@@ -11,11 +10,12 @@ class TableAdmin(admin.ModelAdmin):
     list_display    = ("number", "status_badge", "faol_buyurtmalar", "created_at")
     list_filter     = ("status",)
     search_fields   = ("number",)
-    readonly_fields = ("created_at", "updated_at")
+    # status active_order_count dan kelib chiqadi (Order o'tishlarida yangilanadi)
+    readonly_fields = ("status", "active_order_count", "created_at", "updated_at")
 
     fieldsets = (
         ("Stol ma'lumotlari", {
-            "fields": ("number", "status")
+            "fields": ("number", "status", "active_order_count")
         }),
         ("Vaqt", {
             "fields": ("created_at", "updated_at"),
@@ -46,17 +46,10 @@ class TableAdmin(admin.ModelAdmin):
             'border-radius:12px;font-size:.82rem;font-weight:600;">🔴 Band</span>'
         )
 
-    @admin.display(description="Faol buyurtmalar")
+    @admin.display(description="Faol buyurtmalar", ordering="active_order_count")
     def faol_buyurtmalar(self, obj):
-        count = Order.objects.filter(
-            table=obj,
-            status__in=[
-                Order.Status.NEW,
-                Order.Status.COOKING,
-                Order.Status.READY,
-                Order.Status.SERVED,
-            ]
-        ).count()
+        # Table.active_order_count — har bir qator uchun alohida COUNT so'rovisiz
+        count = obj.active_order_count
         if count:
             return format_html(
                 '<span style="color:#e67e22;font-weight:700;">{} ta buyurtma</span>', count
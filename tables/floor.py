@@ -0,0 +1,99 @@
+"""
+Zal sxemasi: barcha stollar + ularning ochiq buyurtmalari (GET /api/tables/floor/).
+
+Bitta so'rov: Table LEFT JOIN ochiq Order (FilteredRelation) — har bir (stol, ochiq buyurtma)
+jufti bitta qator. Umumiy snapshot TABLE_FLOOR_CACHE_TTL soniya keshlanadi; pul summalari
+har bir so'rovda foydalanuvchiga qarab ajratiladi (for_user): MANAGER hammasini, WAITER faqat
+o'zi ochgan buyurtmalarnikini ko'radi, CHEF — hech birini.
+`age_seconds` serializer'da, javob berish paytida hisoblanadi.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import FilteredRelation, Q
+
+from orders.models import Order
+from .models import Table
+
+# NOT IN (PAID, CANCELED) emas — IN bilan (table, status) indeksi ishlatiladi, yopiq tarix o'qilmaydi
+OPEN_STATUSES = (Order.Status.NEW, Order.Status.COOKING, Order.Status.READY, Order.Status.SERVED)
+CACHE_KEY = "tables:floor"
+
+
+def floor_rows():
+    return (
+        Table.objects.annotate(
+            open_order=FilteredRelation("orders", condition=Q(orders__status__in=OPEN_STATUSES)),
+        )
+        .order_by("number", "open_order__created_at")
+        .values_list(
+            "id", "number", "status", "active_order_count",
+            "open_order__order_code", "open_order__status", "open_order__total",
+            "open_order__due_amount", "open_order__created_at", "open_order__created_by_id",
+        )
+    )
+
+
+def build_floor():
+    """Rol'dan mustaqil snapshot: har bir buyurtmada summa va created_by_id bilan."""
+    tables = {}
+    for table_id, number, status, count, code, order_status, total, due, created_at, created_by_id in floor_rows():
+        table = tables.get(table_id)
+        if table is None:
+            table = tables[table_id] = {
+                "id": table_id,
+                "number": number,
+                "status": status,
+                "active_order_count": count,
+                "open_orders": [],
+            }
+        if code is None:
+            continue
+        table["open_orders"].append({
+            "order_code": code,
+            "status": order_status,
+            "created_at": created_at,
+            "total": total,
+            "due_amount": due,
+            "created_by_id": created_by_id,
+        })
+    return list(tables.values())
+
+
+def for_user(floor, role, user_id):
+    """
+    Snapshot'dan javob: summalar faqat ko'rish huquqi bor buyurtmalar uchun
+    (stol jami open_total/open_due ham faqat shular bo'yicha). CHEF — summalarsiz.
+    """
+    if role == "MANAGER":
+        owns = lambda order: True
+    elif role == "WAITER":
+        owns = lambda order: order["created_by_id"] == user_id
+    else:
+        owns = None
+
+    result = []
+    for table in floor:
+        orders = []
+        open_total = open_due = Decimal("0.00")
+        for order in table["open_orders"]:
+            visible = {k: order[k] for k in ("order_code", "status", "created_at")}
+            if owns is not None and owns(order):
+                visible.update(total=order["total"], due_amount=order["due_amount"])
+                open_total += order["total"]
+                open_due += order["due_amount"]
+            orders.append(visible)
+        row = {**table, "open_orders": orders}
+        if owns is not None:
+            row.update(open_total=open_total, open_due=open_due)
+        result.append(row)
+    return result
+
+
+def get_floor(role, user_id):
+    data = cache.get(CACHE_KEY)
+    if data is None:
+        data = build_floor()
+        cache.set(CACHE_KEY, data, timeout=settings.TABLE_FLOOR_CACHE_TTL)
+    return for_user(data, role, user_id)
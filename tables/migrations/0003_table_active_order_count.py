@@ -0,0 +1,35 @@
+# Generated by Django 4.2.28 on 2026-10-18 14:43
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+CLOSED_STATUSES = ("PAID", "CANCELED")
+
+
+def backfill_active_order_count(apps, schema_editor):
+    Table = apps.get_model("tables", "Table")
+    tables = Table.objects.annotate(
+        open_orders=Count("orders", filter=~Q(orders__status__in=CLOSED_STATUSES))
+    )
+    for table in tables:
+        table.active_order_count = table.open_orders
+        table.status = "OCCUPIED" if table.open_orders else "FREE"
+        table.save(update_fields=["active_order_count", "status"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tables', '0002_alter_table_options_alter_table_created_at_and_more'),
+        ('orders', '0005_order_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='table',
+            name='active_order_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Faol buyurtmalar'),
+        ),
+        migrations.RunPython(backfill_active_order_count, migrations.RunPython.noop),
+    ]
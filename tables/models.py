@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
 
 
 class Table(models.Model):
@@ -11,6 +13,8 @@ class Table(models.Model):
         max_length=10, choices=Status.choices,
         default=Status.FREE, verbose_name="Holati"
     )
+    # ochiq (PAID/CANCELED bo'lmagan) buyurtmalar soni — Order o'tishlarida F() bilan yuritiladi
+    active_order_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Faol buyurtmalar")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Yangilangan")
 
@@ -21,3 +25,22 @@ class Table(models.Model):
 
     def __str__(self) -> str:
         return f"Stol {self.number} [{self.get_status_display()}]"
+
+    # status active_order_count dan kelib chiqadi: > 0 — OCCUPIED, 0 — FREE.
+    # UPDATE ichida o'ng tomondagi ifodalar eski qiymatni ko'radi, shuning uchun atomik.
+    @classmethod
+    def occupy(cls, table_id):
+        cls.objects.filter(id=table_id).update(
+            active_order_count=F("active_order_count") + 1,
+            status=cls.Status.OCCUPIED,
+        )
+
+    @classmethod
+    def release(cls, table_id, count=1):
+        cls.objects.filter(id=table_id, active_order_count__gt=0).update(
+            active_order_count=Greatest(F("active_order_count") - count, Value(0)),
+            status=Case(
+                When(active_order_count__gt=count, then=Value(cls.Status.OCCUPIED)),
+                default=Value(cls.Status.FREE),
+            ),
+        )
@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Table
 
@@ -5,6 +6,29 @@ from .models import Table
 class TableSerializer(serializers.ModelSerializer):
     class Meta:
         model = Table
-        fields = ["id", "number", "status", "created_at", "updated_at"]
+        fields = ["id", "number", "status", "active_order_count", "created_at", "updated_at"]
         # status faqat Order orqali o'zgaradi, API orqali to'g'ridan-to'g'ri o'zgartirish mumkin emas
-        read_only_fields = ["status", "created_at", "updated_at"]
+        read_only_fields = ["status", "active_order_count", "created_at", "updated_at"]
+
+
+class FloorOrderSerializer(serializers.Serializer):
+    order_code = serializers.CharField()
+    status = serializers.CharField()
+    # total/due_amount CHEF va boshqa ofitsiantning buyurtmasi uchun bo'lmaydi (tables.floor.for_user)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    due_amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    created_at = serializers.DateTimeField()
+    age_seconds = serializers.SerializerMethodField()
+
+    def get_age_seconds(self, obj):
+        return int((timezone.now() - obj["created_at"]).total_seconds())
+
+
+class FloorTableSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    number = serializers.IntegerField()
+    status = serializers.CharField()
+    active_order_count = serializers.IntegerField()
+    open_total = serializers.DecimalField(max_digits=14, decimal_places=2, required=False)
+    open_due = serializers.DecimalField(max_digits=14, decimal_places=2, required=False)
+    open_orders = FloorOrderSerializer(many=True)
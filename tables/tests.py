@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from menu.models import Category, MenuItem
+from orders.models import Order, OrderItem
+from . import floor
+from .models import Table
+
+
+class TableFloorTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.waiter = User.objects.create_user(username="waiter", password="pass", role=User.Role.WAITER)
+		self.chef = User.objects.create_user(username="chef", password="pass", role=User.Role.CHEF)
+		self.client = APIClient()
+		self.client.force_authenticate(self.waiter)
+
+		item = MenuItem.objects.create(category=Category.objects.create(name="Drinks"), name="Tea", price=Decimal("1.50"))
+		self.tables = [Table.objects.create(number=n) for n in range(1, 61)]
+		for table in self.tables[:2]:
+			order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=table, created_by=self.waiter)
+			OrderItem.objects.create(order=order, menu_item=item, qty=2)
+		closed = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.tables[0], created_by=self.waiter)
+		closed.change_status(Order.Status.CANCELED, by_user=self.waiter)
+
+	def test_floor_single_query_then_cached(self):
+		with self.assertNumQueries(1):
+			r = self.client.get("/api/tables/floor/")
+		self.assertEqual(r.status_code, 200)
+		self.assertEqual(len(r.data), 60)
+
+		first = r.data[0]
+		self.assertEqual(first["number"], 1)
+		self.assertEqual(first["active_order_count"], 1)
+		self.assertEqual(len(first["open_orders"]), 1)
+		self.assertEqual(first["open_orders"][0]["total"], "3.00")
+		self.assertEqual(first["open_due"], "3.00")
+		self.assertIn("age_seconds", first["open_orders"][0])
+		self.assertEqual(r.data[2]["open_orders"], [])
+
+		with self.assertNumQueries(0):
+			self.client.get("/api/tables/floor/")
+
+	def test_chef_floor_hides_money(self):
+		self.client.force_authenticate(self.chef)
+		r = self.client.get("/api/tables/floor/")
+		self.assertEqual(r.status_code, 200)
+		self.assertNotIn("open_total", r.data[0])
+		self.assertNotIn("total", r.data[0]["open_orders"][0])
+
+	def test_waiter_sees_money_only_for_own_orders(self):
+		other = User.objects.create_user(username="other", password="pass", role=User.Role.WAITER)
+		order = Order.objects.create(order_type=Order.OrderType.DINE_IN, table=self.tables[0], created_by=other)
+		OrderItem.objects.create(order=order, menu_item=MenuItem.objects.get(), qty=4)
+
+		first = self.client.get("/api/tables/floor/").data[0]
+		mine, theirs = first["open_orders"]
+		self.assertEqual(mine["total"], "3.00")
+		self.assertNotIn("total", theirs)
+		self.assertNotIn("due_amount", theirs)
+		self.assertEqual((first["open_total"], first["open_due"]), ("3.00", "3.00"))
+
+		self.client.force_authenticate(User.objects.create_user(username="boss", password="pass", role=User.Role.MANAGER))
+		first = self.client.get("/api/tables/floor/").data[0]
+		self.assertEqual([o["total"] for o in first["open_orders"]], ["3.00", "6.00"])
+		self.assertEqual(first["open_total"], "9.00")
+
+	def test_floor_reads_open_orders_through_table_status_index(self):
+		if connection.vendor not in ("sqlite", "postgresql"):
+			self.skipTest("EXPLAIN tekshiruvi faqat SQLite/PostgreSQL uchun.")
+		plan = floor.floor_rows().explain()
+		self.assertIn("order_table_status_idx", plan)
+		if connection.vendor == "sqlite":
+			# faqat table_id bo'yicha qidiruv — har bir stolning butun tarixi o'qiladi
+			self.assertNotRegex(plan, r"order_table_status_idx \(table_id=\?\)")
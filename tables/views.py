@@ -1,9 +1,13 @@
+from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import action
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from accounts.permissions import ManagerOrReadOnly
+from accounts.permissions import ManagerOrReadOnly, _role
+from . import floor
 from .models import Table
-from .serializers import TableSerializer
+from .serializers import FloorTableSerializer, TableSerializer
 
 
 class TableViewSet(ModelViewSet):
@@ -12,3 +16,13 @@ class TableViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated, ManagerOrReadOnly]
     ordering_fields = ["number", "status", "id"]
     search_fields = ["number"]
+
+    @extend_schema(responses={200: FloorTableSerializer(many=True)})
+    @action(detail=False, methods=["get"], url_path="floor", pagination_class=None)
+    def floor(self, request):
+        """
+        Zal sxemasi: barcha stollar + ochiq buyurtmalar (kod, status, summa, yoshi) — bitta so'rovda.
+        Ofitsiant ilovasi har stol uchun /api/orders/?table=X so'ramasligi uchun.
+        """
+        data = floor.get_floor(_role(request.user), request.user.pk)
+        return Response(FloorTableSerializer(data, many=True).data)